@@ -11,7 +11,7 @@ from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from ..database import User, Portfolio, UserPreferences
+from ..database import User, Portfolio, UserPreferences, UserStats
 from .schemas import UserCreate, UserLogin, Token, UserProfileUpdate, UserPreferencesUpdate, PasswordChangeRequest
 
 # Security configuration
@@ -112,7 +112,10 @@ class AuthService:
             total_returns=0.00
         )
         db.add(portfolio)
-        
+
+        # Create stats row up-front so profile/search reads stay pure SELECTs
+        db.add(UserStats(user_id=db_user.id))
+
         await db.commit()
         await db.refresh(db_user)
         return db_user
@@ -25,6 +25,9 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
     
+    # Redis - shared live-price cache across workers (optional, falls back to in-process dicts)
+    REDIS_URL: str = os.getenv("REDIS_URL", "")
+
     # Alpha Vantage API (Free tier: 25 requests/day, 5 requests/minute)
     ALPHA_VANTAGE_API_KEY: str = os.getenv("ALPHA_VANTAGE_API_KEY", "IIKESCGRVVVG7T3B")  # Get free key from: https://www.alphavantage.co/support/#api-key
     
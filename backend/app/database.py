@@ -5,18 +5,32 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Numeric
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Numeric, Index, func, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, relationship
 
 from .config import settings
 
-# Create async engine
+# Create async engine. The pool is sized explicitly so the 15-second
+# scheduler tick and concurrent request handlers don't serialize on the
+# default 5-connection checkout; pre-ping drops stale connections before
+# they surface as errors. SQLite (dev) manages its own pooling, so the
+# sizing kwargs only apply to the Postgres URL.
+_engine_kwargs = {}
+if settings.DATABASE_URL.startswith("postgresql"):
+    _engine_kwargs = {
+        "pool_size": 15,
+        "max_overflow": 10,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    **_engine_kwargs
 )
 
 # Create async session factory
@@ -246,7 +260,18 @@ class CompetitionTrade(Base):
     """Competition trade model for tracking trades within competitions."""
     
     __tablename__ = "competition_trades"
-    
+
+    # Composite index for the hot position/average-price queries which always
+    # filter by (participant_id, symbol, trade_type). On PostgreSQL the INCLUDE
+    # columns allow index-only aggregation of quantity/total_amount.
+    __table_args__ = (
+        Index(
+            "ix_ct_pid_sym_type",
+            "participant_id", "symbol", "trade_type",
+            postgresql_include=["quantity", "total_amount"],
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     competition_id = Column(Integer, ForeignKey("competitions.id"), nullable=False)
     participant_id = Column(Integer, ForeignKey("competition_participants.id"), nullable=False)
@@ -257,7 +282,10 @@ class CompetitionTrade(Base):
     price = Column(Numeric(10, 2), nullable=False)
     total_amount = Column(Numeric(15, 2), nullable=False)
     profit_loss = Column(Numeric(15, 2), nullable=True)  # Calculated when position is closed
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # DB clock keeps trade ordering monotonic on fresh tables; the Python
+    # default covers existing tables created before the server default
+    # (create_all never alters columns), so created_at is never NULL
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     
     # Relationships
     competition = relationship("Competition")
@@ -278,3 +306,34 @@ async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+        # Retrofit the composite competition-trade index onto databases
+        # whose table predates it - create_all only builds indexes as part
+        # of creating a brand-new table
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_ct_pid_sym_type ON competition_trades "
+                "(participant_id, symbol, trade_type) INCLUDE (quantity, total_amount)"
+            ))
+        else:
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_ct_pid_sym_type ON competition_trades "
+                "(participant_id, symbol, trade_type)"
+            ))
+
+        if engine.dialect.name == "postgresql":
+            # Trigram index so leading-wildcard user search (ILIKE '%q%')
+            # uses an index scan instead of a full table scan. The indexed
+            # expression must match the one built in SocialService.search_users.
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS users_search_gin ON users "
+                "USING gin ((coalesce(username, '') || ' ' || "
+                "coalesce(full_name, '') || ' ' || email) gin_trgm_ops)"
+            ))
+            # Order-insensitive pair index so friendship lookups match one
+            # index scan whichever side sent the request (see search_users)
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS friendship_pair_idx ON friendships "
+                "(least(requester_id, addressee_id), greatest(requester_id, addressee_id))"
+            ))
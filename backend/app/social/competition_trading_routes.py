@@ -3,6 +3,7 @@ Competition Trading routes - separate from personal trading.
 """
 from typing import List, Annotated
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, and_
 
@@ -11,7 +12,7 @@ from ..auth.routes import get_current_user
 from ..trading.schemas import TradeRequest, TradeResponse, OrderType
 from .competition_trading_service import CompetitionTradingService
 
-router = APIRouter(prefix="/competitions", tags=["competition-trading"])
+router = APIRouter(prefix="/competitions", tags=["competition-trading"], default_response_class=ORJSONResponse)
 competition_trading_service = CompetitionTradingService()
 
 
@@ -9,7 +9,6 @@ from typing import Dict, List, Optional
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
-from datetime import datetime
 
 from ..database import CompetitionParticipant, CompetitionTrade, Competition
 from ..trading.schemas import TradeRequest, TradeResponse, OrderType
@@ -18,7 +17,11 @@ from ..stocks.robust_services import stock_service
 
 class CompetitionTradingService:
     """Service for handling competition-specific trading."""
-    
+
+    # Stateless service - no per-instance dict needed
+    __slots__ = ()
+
+
     async def execute_competition_trade(
         self, 
         db: AsyncSession, 
@@ -46,8 +49,10 @@ class CompetitionTradingService:
             net_proceeds = trade_value - brokerage  # For SELL: proceeds after brokerage
             
             if trade_request.order_type == OrderType.BUY:
-                # Check if participant has enough cash (including brokerage)
-                if float(participant.current_balance) < total_cost:
+                # Check if participant has enough cash (including brokerage).
+                # Compare in Decimal so the check matches the deduction exactly.
+                total_cost_dec = Decimal(str(total_cost))
+                if participant.current_balance < total_cost_dec:
                     return TradeResponse(
                         success=False,
                         message=f"Insufficient cash. Need ${total_cost:,.2f} (including brokerage), have ${float(participant.current_balance):,.2f}",
@@ -58,7 +63,7 @@ class CompetitionTradingService:
                     )
                 
                 # Update participant cash (deduct total cost including brokerage)
-                participant.current_balance = participant.current_balance - Decimal(str(total_cost))
+                participant.current_balance = participant.current_balance - total_cost_dec
                 
                 # Create trade record
                 trade = CompetitionTrade(
@@ -69,8 +74,7 @@ class CompetitionTradingService:
                     trade_type="BUY",
                     quantity=trade_request.quantity,
                     price=Decimal(str(current_price)),
-                    total_amount=Decimal(str(trade_value)),
-                    created_at=datetime.utcnow()
+                    total_amount=Decimal(str(trade_value))
                 )
                 
             else:  # SELL
@@ -98,8 +102,7 @@ class CompetitionTradingService:
                     trade_type="SELL",
                     quantity=trade_request.quantity,
                     price=Decimal(str(current_price)),
-                    total_amount=Decimal(str(trade_value)),
-                    created_at=datetime.utcnow()
+                    total_amount=Decimal(str(trade_value))
                 )
             
             # Save to database
@@ -138,14 +141,18 @@ class CompetitionTradingService:
         
         # Get all positions
         positions = await self._get_all_positions(db, participant.id)
-        
+
+        # Fetch live prices for every held symbol in one batched call
+        held_symbols = [symbol for symbol, quantity in positions.items() if quantity > 0]
+        stock_data_map = await stock_service.get_stock_infos(held_symbols) if held_symbols else {}
+
         # Calculate total portfolio value
         total_stock_value = 0.0
         position_details = []
-        
+
         for symbol, quantity in positions.items():
             if quantity > 0:
-                stock_data = await stock_service.get_stock_info(symbol)
+                stock_data = stock_data_map.get(symbol)
                 if stock_data:
                     current_value = float(stock_data.current_price * quantity)
                     total_stock_value += current_value
@@ -5,6 +5,7 @@ import logging
 from datetime import datetime
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
@@ -20,7 +21,9 @@ from .competition_services import competition_service
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/social", tags=["social"])
+# orjson serializes the Decimal/datetime-heavy leaderboard payloads natively,
+# far faster than the stdlib json encoder FastAPI uses by default
+router = APIRouter(prefix="/social", tags=["social"], default_response_class=ORJSONResponse)
 
 
 @router.get("/profile/{user_id}", response_model=UserPublicProfile)
@@ -4,7 +4,7 @@ Social features schemas for TradePulse.
 from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class UserPublicProfile(BaseModel):
@@ -27,9 +27,8 @@ class UserPublicProfile(BaseModel):
     current_streak: int = 0
     best_streak: int = 0
     rank_points: int = 1000
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserStats(BaseModel):
@@ -46,9 +45,8 @@ class UserStats(BaseModel):
     current_streak: int
     best_streak: int
     rank_points: int
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FriendRequest(BaseModel):
@@ -63,9 +61,8 @@ class FriendshipResponse(BaseModel):
     addressee: UserPublicProfile
     status: str
     created_at: datetime
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CompetitionCreate(BaseModel):
@@ -92,9 +89,8 @@ class CompetitionResponse(BaseModel):
     current_participants: int
     is_public: bool
     created_at: datetime
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CompetitionParticipantResponse(BaseModel):
@@ -109,18 +105,16 @@ class CompetitionParticipantResponse(BaseModel):
     trades_count: int
     status: str
     joined_at: datetime
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CompetitionLeaderboard(BaseModel):
     """Competition leaderboard schema."""
     competition: CompetitionResponse
     participants: List[CompetitionParticipantResponse]
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CompetitionTradeResponse(BaseModel):
@@ -133,9 +127,8 @@ class CompetitionTradeResponse(BaseModel):
     total_amount: Decimal
     profit_loss: Optional[Decimal]
     created_at: datetime
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserSearch(BaseModel):
@@ -149,9 +142,8 @@ class UserSearch(BaseModel):
     competition_wins: int
     is_friend: bool
     friendship_status: Optional[str]  # None, 'pending', 'accepted'
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ProfileUpdateRequest(BaseModel):
@@ -5,22 +5,85 @@ import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import List, Optional, Tuple
-from sqlalchemy import and_, or_, func, desc
+from sqlalchemy import and_, or_, func, desc, select, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload, aliased
 
 from ..database import (
-    User, UserStats, Friendship, Competition, CompetitionParticipant, 
+    User, UserStats, Friendship, Competition, CompetitionParticipant,
     CompetitionTrade, Trade, Portfolio
 )
 from .schemas import (
-    UserPublicProfile, CompetitionCreate, FriendRequest, 
+    UserPublicProfile, CompetitionCreate, FriendRequest,
     ProfileUpdateRequest, UserSearch
 )
 
 logger = logging.getLogger(__name__)
 
 
+def _build_user_search_stmt(dialect_name: str):
+    """
+    Build the user-search statement once per dialect with named bindparams.
+    Reusing the same statement object lets SQLAlchemy serve the compiled SQL
+    from its cache instead of recompiling on every keystroke.
+    """
+    friendship = aliased(Friendship)
+    me = bindparam("me")
+
+    if dialect_name == "postgresql":
+        # Order-insensitive pair match that the friendship_pair_idx
+        # expression index (created in init_db) can answer with one
+        # index scan instead of a two-branch BitmapOr
+        friendship_on = and_(
+            func.least(friendship.requester_id, friendship.addressee_id) ==
+            func.least(me, User.id),
+            func.greatest(friendship.requester_id, friendship.addressee_id) ==
+            func.greatest(me, User.id)
+        )
+    else:
+        # SQLite has no least()/greatest()
+        friendship_on = or_(
+            and_(
+                friendship.requester_id == me,
+                friendship.addressee_id == User.id
+            ),
+            and_(
+                friendship.addressee_id == me,
+                friendship.requester_id == User.id
+            )
+        )
+
+    # Select just the columns the UserSearch schema needs - skips ORM
+    # entity hydration and identity-map bookkeeping for every row
+    return select(
+        User.id,
+        User.username,
+        User.email,
+        User.full_name,
+        User.profile_picture_url,
+        UserStats.rank_points,
+        UserStats.competition_wins,
+        friendship.status
+    ).outerjoin(
+        UserStats, UserStats.user_id == User.id
+    ).outerjoin(
+        friendship, friendship_on
+    ).where(
+        and_(
+            User.id != me,
+            User.is_active == True,
+            # Single concatenated ILIKE matching the users_search_gin
+            # trigram index expression created in init_db
+            (func.coalesce(User.username, '') + ' ' +
+             func.coalesce(User.full_name, '') + ' ' +
+             User.email).ilike(bindparam("q"))
+        )
+    ).limit(bindparam("lim"))
+
+
+_user_search_stmts = {}
+
+
 class SocialService:
     """Service for managing social features."""
     
@@ -31,26 +94,22 @@ class SocialService:
             # Get user with stats
             from sqlalchemy import select
             
-            query = select(User).options(selectinload(User.stats)).where(User.id == user_id)
+            query = select(User).options(selectinload(User.stats), raiseload("*")).where(User.id == user_id)
             result = await db.execute(query)
             user = result.scalar_one_or_none()
             
             if not user:
                 return None
-            
-            # Ensure user has stats
-            if not user.stats:
-                user_stats = UserStats(user_id=user_id)
-                db.add(user_stats)
-                await db.commit()
-                await db.refresh(user_stats)
-                user.stats = user_stats
-            
+
+            # Stats rows are created at signup; older users without one just
+            # render the defaults - no writes on this read path
+            stats = user.stats
+
             # Calculate win rate
             win_rate = 0.0
-            if user.stats.total_trades > 0:
-                win_rate = (user.stats.winning_trades / user.stats.total_trades) * 100
-            
+            if stats and stats.total_trades > 0:
+                win_rate = (stats.winning_trades / stats.total_trades) * 100
+
             return UserPublicProfile(
                 id=user.id,
                 username=user.username or f"trader_{user.id}",
@@ -58,16 +117,16 @@ class SocialService:
                 profile_picture_url=user.profile_picture_url,
                 bio=user.bio,
                 member_since=user.created_at,
-                total_trades=user.stats.total_trades,
-                winning_trades=user.stats.winning_trades,
-                losing_trades=user.stats.losing_trades,
+                total_trades=stats.total_trades if stats else 0,
+                winning_trades=stats.winning_trades if stats else 0,
+                losing_trades=stats.losing_trades if stats else 0,
                 win_rate=round(win_rate, 2),
-                total_profit_loss=user.stats.total_profit_loss,
-                competition_wins=user.stats.competition_wins,
-                competition_participations=user.stats.competition_participations,
-                current_streak=user.stats.current_streak,
-                best_streak=user.stats.best_streak,
-                rank_points=user.stats.rank_points
+                total_profit_loss=stats.total_profit_loss if stats else Decimal('0.00'),
+                competition_wins=stats.competition_wins if stats else 0,
+                competition_participations=stats.competition_participations if stats else 0,
+                current_streak=stats.current_streak if stats else 0,
+                best_streak=stats.best_streak if stats else 0,
+                rank_points=stats.rank_points if stats else 1000
             )
             
         except Exception as e:
@@ -88,7 +147,7 @@ class SocialService:
             query = update(User).where(User.id == user_id).values(
                 full_name=profile_data.full_name,
                 bio=profile_data.bio,
-                updated_at=datetime.utcnow()
+                updated_at=func.now()
             )
             await db.execute(query)
             
@@ -116,74 +175,35 @@ class SocialService:
     ) -> List[UserSearch]:
         """Search for users by username or full name."""
         try:
-            from sqlalchemy import select
-            
-            # First, let's just search users without requiring UserStats
-            search_query = select(User).where(
-                and_(
-                    User.id != current_user_id,
-                    User.is_active == True,
-                    or_(
-                        User.username.ilike(f"%{query}%"),
-                        User.full_name.ilike(f"%{query}%"),
-                        User.email.ilike(f"%{query}%")
-                    )
-                )
-            ).limit(limit)
-            
-            result = await db.execute(search_query)
-            users = result.scalars().all()
-            
-            # Now get UserStats for these users (create if missing)
-            user_ids = [user.id for user in users]
-            stats_query = select(UserStats).where(UserStats.user_id.in_(user_ids))
-            stats_result = await db.execute(stats_query)
-            user_stats_map = {stats.user_id: stats for stats in stats_result.scalars().all()}
-            
-            # Get friendship statuses
-            friendship_query = select(Friendship).where(
-                or_(
-                    and_(
-                        Friendship.requester_id == current_user_id,
-                        Friendship.addressee_id.in_(user_ids)
-                    ),
-                    and_(
-                        Friendship.addressee_id == current_user_id,
-                        Friendship.requester_id.in_(user_ids)
-                    )
-                )
+            # One SELECT: matching users, their stats, and any friendship with
+            # the searcher (either direction) via outer joins. The statement
+            # is built once per dialect and reused with bindparams
+            dialect_name = db.get_bind().dialect.name
+            search_query = _user_search_stmts.get(dialect_name)
+            if search_query is None:
+                search_query = _build_user_search_stmt(dialect_name)
+                _user_search_stmts[dialect_name] = search_query
+
+            result = await db.execute(
+                search_query,
+                {"me": current_user_id, "q": f"%{query}%", "lim": limit}
             )
-            
-            friendship_result = await db.execute(friendship_query)
-            friendships = {
-                (f.requester_id, f.addressee_id): f.status 
-                for f in friendship_result.scalars().all()
-            }
-            
+
             # Build response
             search_results = []
-            for user in users:
-                # Get or create user stats
-                stats = user_stats_map.get(user.id)
-                if not stats:
-                    stats = UserStats(user_id=user.id, rank_points=0, competition_wins=0)
-                
-                # Check friendship status
-                friendship_key1 = (current_user_id, user.id)
-                friendship_key2 = (user.id, current_user_id)
-                friendship_status = friendships.get(friendship_key1) or friendships.get(friendship_key2)
-                is_friend = friendship_status == "accepted"
-                
+            for row in result.all():
+                is_friend = row.status == "accepted"
+
                 search_results.append(UserSearch(
-                    id=user.id,
-                    username=user.username,  # Allow None for username
-                    email=user.email,  # Include email for search results
-                    full_name=user.full_name,
-                    profile_picture_url=user.profile_picture_url,
-                    rank_points=stats.rank_points,
-                    competition_wins=stats.competition_wins,
+                    id=row.id,
+                    username=row.username,  # Allow None for username
+                    email=row.email,  # Include email for search results
+                    full_name=row.full_name,
+                    profile_picture_url=row.profile_picture_url,
+                    rank_points=row.rank_points if row.rank_points is not None else 0,
+                    competition_wins=row.competition_wins if row.competition_wins is not None else 0,
                     is_friend=is_friend,
-                    friendship_status=friendship_status
+                    friendship_status=row.status
                 ))
             
             return search_results
@@ -256,7 +276,8 @@ class SocialService:
             
             query = select(Friendship).options(
                 selectinload(Friendship.requester),
-                selectinload(Friendship.addressee)
+                selectinload(Friendship.addressee),
+                raiseload("*")
             ).where(
                 and_(
                     Friendship.addressee_id == user_id,
@@ -315,7 +336,7 @@ class SocialService:
             new_status = "accepted" if accept else "rejected"
             update_query = update(Friendship).where(Friendship.id == request_id).values(
                 status=new_status,
-                updated_at=datetime.utcnow()
+                updated_at=func.now()
             )
             
             await db.execute(update_query)
@@ -333,12 +354,19 @@ class SocialService:
     async def get_friends_list(db: AsyncSession, user_id: int) -> List[UserPublicProfile]:
         """Get user's friends list."""
         try:
-            from sqlalchemy import select
-            
-            # Get accepted friendships
-            query = select(Friendship).options(
-                selectinload(Friendship.requester),
-                selectinload(Friendship.addressee)
+            from sqlalchemy import select, case
+
+            # Resolve the "other side" of each accepted friendship and join
+            # straight to User and UserStats - one query for the whole list
+            friend_id = case(
+                (Friendship.requester_id == user_id, Friendship.addressee_id),
+                else_=Friendship.requester_id
+            )
+
+            query = select(User, UserStats).join(
+                Friendship, User.id == friend_id
+            ).outerjoin(
+                UserStats, UserStats.user_id == User.id
             ).where(
                 and_(
                     or_(
@@ -348,19 +376,36 @@ class SocialService:
                     Friendship.status == "accepted"
                 )
             )
-            
+
             result = await db.execute(query)
-            friendships = result.scalars().all()
-            
+
             friends = []
-            for friendship in friendships:
-                friend_user = friendship.addressee if friendship.requester_id == user_id else friendship.requester
-                profile = await SocialService.get_user_public_profile(db, friend_user.id)
-                if profile:
-                    friends.append(profile)
-            
+            for user, stats in result.all():
+                total_trades = stats.total_trades if stats else 0
+                winning_trades = stats.winning_trades if stats else 0
+                win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0.0
+
+                friends.append(UserPublicProfile(
+                    id=user.id,
+                    username=user.username or f"trader_{user.id}",
+                    full_name=user.full_name,
+                    profile_picture_url=user.profile_picture_url,
+                    bio=user.bio,
+                    member_since=user.created_at,
+                    total_trades=total_trades,
+                    winning_trades=winning_trades,
+                    losing_trades=stats.losing_trades if stats else 0,
+                    win_rate=round(win_rate, 2),
+                    total_profit_loss=stats.total_profit_loss if stats else Decimal('0.00'),
+                    competition_wins=stats.competition_wins if stats else 0,
+                    competition_participations=stats.competition_participations if stats else 0,
+                    current_streak=stats.current_streak if stats else 0,
+                    best_streak=stats.best_streak if stats else 0,
+                    rank_points=stats.rank_points if stats else 1000
+                ))
+
             return friends
-            
+
         except Exception as e:
             logger.error(f"Error getting friends list: {e}")
             return []
@@ -44,14 +44,27 @@ Fixed all previous issues - now provides ACTUAL current stock prices.
 import asyncio
 import logging
 import json
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
 import httpx
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 
-from ..database import Stock, Portfolio, Position, get_db
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+from ..config import settings
+from ..database import Stock, Portfolio, Position, get_db, engine
 from .schemas import StockInfo
 
 logger = logging.getLogger(__name__)
@@ -61,19 +74,78 @@ class RealLiveDataService:
     REAL live stock data service using Yahoo Finance Chart API.
     Provides ACTUAL current market prices - no more simulation!
     """
-    
+
     def __init__(self):
+        # HTTP/2 multiplexes all concurrent Yahoo fetches over one TLS
+        # connection; keepalive keeps it warm between 15s scheduler ticks
         self.client = httpx.AsyncClient(
-            timeout=15.0,
+            http2=True,
+            timeout=httpx.Timeout(connect=2.0, read=10.0, write=5.0, pool=5.0),
+            limits=httpx.Limits(
+                max_connections=32,
+                max_keepalive_connections=16,
+                keepalive_expiry=60.0
+            ),
             headers={
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
         )
         self.price_cache = {}
+        self.price_bytes = {}  # pre-serialized JSON per symbol, same lifetime as price_cache
         self.last_update = {}
+        # Shared Redis cache so every worker and the scheduler see the same
+        # prices; falls back to the in-process dicts when Redis isn't set up
+        self.redis = None
+        if aioredis and settings.REDIS_URL:
+            self.redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.cache_ttl = 10  # seconds
+        # Failed lookups (delisted/bad symbols) are remembered longer so they
+        # don't trigger a fresh Yahoo request on every call
+        self.negative_ttl = 60  # seconds
+        self.negative_until = {}
+        # Dedicated asyncpg pool for the per-tick bulk UPDATEs (Postgres only);
+        # created lazily on the first tick
+        self._pg_pool = None
+        # In-flight fetches by symbol so concurrent requests for the same
+        # symbol share one Yahoo call instead of stampeding on a cache miss
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Hit/miss counters for the price cache, logged once a minute so
+        # the TTL and cache sizing can be tuned from production logs
+        self.cache_stats = {"hits": 0, "misses": 0}
+        self._stats_last_logged = time.monotonic()
         # Use the WORKING Yahoo Finance Chart API
         self.base_url = "https://query1.finance.yahoo.com/v8/finance/chart"
-        
+        # Multi-symbol quote endpoint - one request prices a whole batch
+        self.quote_url = "https://query1.finance.yahoo.com/v7/finance/quote"
+        self.quote_batch_size = 50
+
+    async def _redis_get_prices(self, symbols: List[str]) -> Dict[str, Any]:
+        """Read cached prices for symbols from Redis (one MGET round-trip)."""
+        if not self.redis or not symbols:
+            return {}
+        try:
+            values = await self.redis.mget([f"px:{s}" for s in symbols])
+            return {
+                symbol: orjson.loads(value)
+                for symbol, value in zip(symbols, values)
+                if value
+            }
+        except Exception as e:
+            logger.warning(f"Redis price read failed: {e}")
+            return {}
+
+    async def _redis_set_prices(self, price_data_map: Dict[str, Any]):
+        """Write freshly fetched prices to Redis with the cache TTL."""
+        if not self.redis or not price_data_map:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            for symbol, price_data in price_data_map.items():
+                pipe.set(f"px:{symbol}", orjson.dumps(price_data), ex=self.cache_ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis price write failed: {e}")
+
     async def get_live_price(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
         Get REAL live stock price from Yahoo Finance Chart API.
@@ -83,11 +155,68 @@ class RealLiveDataService:
         cache_key = symbol.upper()
         now = datetime.now()
         
-        if (cache_key in self.price_cache and 
+        if (cache_key in self.price_cache and
             cache_key in self.last_update and
             (now - self.last_update[cache_key]).seconds < 10):
+            self._record_cache_hit()
             return self.price_cache[cache_key]
-        
+
+        # Honor the negative cache - a recently failed symbol stays failed
+        if cache_key in self.negative_until:
+            if now < self.negative_until[cache_key]:
+                return None
+            del self.negative_until[cache_key]
+
+        # Check the shared Redis cache - another worker may have fetched it
+        redis_hit = await self._redis_get_prices([cache_key])
+        if redis_hit:
+            price_data = redis_hit[cache_key]
+            self.price_cache[cache_key] = price_data
+            self.price_bytes[cache_key] = orjson.dumps(price_data)
+            self.last_update[cache_key] = now
+            self._record_cache_hit()
+            return price_data
+
+        # Single-flight: if another task is already fetching this symbol,
+        # await its result instead of issuing a duplicate Yahoo request
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return await inflight
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        self.cache_stats["misses"] += 1
+        self._maybe_log_cache_stats()
+        price_data = None
+        try:
+            price_data = await self._fetch_chart_price(symbol, cache_key, now)
+        finally:
+            self._inflight.pop(cache_key, None)
+            future.set_result(price_data)
+        return price_data
+
+    def _record_cache_hit(self):
+        """Count a price-cache hit and emit the periodic stats line."""
+        self.cache_stats["hits"] += 1
+        self._maybe_log_cache_stats()
+
+    def _maybe_log_cache_stats(self):
+        """Log and reset hit/miss counters roughly once a minute."""
+        elapsed = time.monotonic() - self._stats_last_logged
+        if elapsed < 60:
+            return
+        hits = self.cache_stats["hits"]
+        misses = self.cache_stats["misses"]
+        total = hits + misses
+        logger.info(
+            "Price cache: %d hits / %d misses (%.1f%% hit rate) over %.0fs",
+            hits, misses, 100.0 * hits / total if total else 0.0, elapsed
+        )
+        self.cache_stats = {"hits": 0, "misses": 0}
+        self._stats_last_logged = time.monotonic()
+
+    async def _fetch_chart_price(self, symbol: str, cache_key: str, now: datetime) -> Optional[Dict[str, Any]]:
+        """Fetch one symbol from the chart API and populate the caches."""
         try:
             # Use Yahoo Finance Chart API - this is what actually works!
             url = f"{self.base_url}/{symbol.upper()}"
@@ -100,10 +229,11 @@ class RealLiveDataService:
             response = await self.client.get(url, params=params)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if 'chart' not in data or not data['chart']['result']:
                 logger.error(f"No chart data for {symbol}")
+                self.negative_until[cache_key] = now + timedelta(seconds=self.negative_ttl)
                 return None
                 
             result = data['chart']['result'][0]
@@ -117,6 +247,7 @@ class RealLiveDataService:
             
             if not current_price:
                 logger.error(f"No price data found for {symbol}")
+                self.negative_until[cache_key] = now + timedelta(seconds=self.negative_ttl)
                 return None
             
             previous_close = meta.get('previousClose', current_price)
@@ -141,125 +272,309 @@ class RealLiveDataService:
                 'last_updated': datetime.now().isoformat()
             }
             
-            # Cache the result
+            # Cache the result locally and in Redis for other workers,
+            # serializing once so cache hits can skip the JSON encoder
             self.price_cache[cache_key] = price_data
+            self.price_bytes[cache_key] = orjson.dumps(price_data)
             self.last_update[cache_key] = now
-            
+            await self._redis_set_prices({cache_key: price_data})
+
             logger.info(f"✅ REAL LIVE PRICE for {symbol}: ${current_price:.2f} (change: {change:+.2f}, {change_percent:+.2f}%)")
             return price_data
             
         except Exception as e:
             logger.error(f"🚨 Yahoo Finance API failed for {symbol}: {e}")
-            # Return None to indicate failure - no more fake simulation
+            # Remember the failure so repeated requests short-circuit;
+            # still no fake simulation data
+            self.negative_until[cache_key] = now + timedelta(seconds=self.negative_ttl)
             return None
     
-    async def update_stock_prices(self, symbols: List[str]) -> Dict[str, Any]:
+    async def get_live_price_bytes(self, symbol: str) -> Optional[bytes]:
         """
-        Update prices for multiple stocks concurrently.
-        Returns a dict of successful updates with REAL market data.
+        Get the live price payload as pre-serialized JSON bytes.
+        On a warm cache this is a dict lookup - no JSON encoding per request.
+        """
+        cache_key = symbol.upper()
+        now = datetime.now()
+
+        if (cache_key in self.price_bytes and
+            cache_key in self.last_update and
+            (now - self.last_update[cache_key]).seconds < 10):
+            return self.price_bytes[cache_key]
+
+        price_data = await self.get_live_price(symbol)
+        if not price_data:
+            return None
+
+        # get_live_price populated price_bytes on its way out
+        return self.price_bytes.get(cache_key) or orjson.dumps(price_data)
+
+    async def _fetch_quote_batch(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        """Fetch one chunk of symbols from the multi-symbol quote endpoint."""
+        params = {'symbols': ','.join(symbols)}
+        response = await self.client.get(self.quote_url, params=params)
+        response.raise_for_status()
+
+        data = orjson.loads(response.content)
+        return data.get('quoteResponse', {}).get('result', [])
+
+    async def get_live_prices_batch(self, symbols: List[str]) -> Dict[str, Any]:
+        """
+        Get REAL live prices for many symbols with batched quote requests.
+        One HTTP round-trip serves up to 50 symbols instead of one per symbol,
+        and the quote payload skips the per-minute candle arrays entirely.
         """
         results = {}
-        
-        # Process stocks concurrently for better performance
-        tasks = [self.get_live_price(symbol) for symbol in symbols]
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for symbol, response in zip(symbols, responses):
+        unique_symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        if not unique_symbols:
+            return results
+
+        now = datetime.now()
+
+        # Serve fresh symbols from cache, only fetch the stale ones;
+        # symbols in the negative cache are skipped outright
+        to_fetch = []
+        for symbol in unique_symbols:
+            if (symbol in self.price_cache and
+                symbol in self.last_update and
+                (now - self.last_update[symbol]).seconds < 10):
+                results[symbol] = self.price_cache[symbol]
+            elif symbol in self.negative_until and now < self.negative_until[symbol]:
+                continue
+            else:
+                self.negative_until.pop(symbol, None)
+                to_fetch.append(symbol)
+
+        if not to_fetch:
+            return results
+
+        # One MGET against the shared cache before going to Yahoo
+        redis_hits = await self._redis_get_prices(to_fetch)
+        for symbol, price_data in redis_hits.items():
+            self.price_cache[symbol] = price_data
+            self.price_bytes[symbol] = orjson.dumps(price_data)
+            self.last_update[symbol] = now
+            results[symbol] = price_data
+        to_fetch = [s for s in to_fetch if s not in redis_hits]
+
+        if not to_fetch:
+            return results
+
+        chunks = [
+            to_fetch[i:i + self.quote_batch_size]
+            for i in range(0, len(to_fetch), self.quote_batch_size)
+        ]
+        responses = await asyncio.gather(
+            *(self._fetch_quote_batch(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+
+        fresh = {}
+        answered = set()
+        for chunk, response in zip(chunks, responses):
             if isinstance(response, Exception):
-                logger.error(f"Failed to update {symbol}: {response}")
+                # Transient chunk failure - don't negative-cache its symbols
+                logger.error(f"🚨 Batched quote request failed for {chunk}: {response}")
                 continue
-            
-            if response:
-                results[symbol] = response
-                logger.info(f"📈 Updated {symbol}: ${response['current_price']:.2f}")
+            answered.update(chunk)
+
+            for quote in response:
+                symbol = quote.get('symbol', '').upper()
+                current_price = (quote.get('regularMarketPrice') or
+                                 quote.get('preMarketPrice') or
+                                 quote.get('postMarketPrice'))
+                if not symbol or not current_price:
+                    continue
+
+                previous_close = quote.get('regularMarketPreviousClose', current_price)
+                change = current_price - previous_close
+                change_percent = (change / previous_close * 100) if previous_close else 0
+
+                price_data = {
+                    'symbol': symbol,
+                    'name': quote.get('longName') or quote.get('shortName') or symbol,
+                    'current_price': float(current_price),
+                    'previous_close': float(previous_close),
+                    'change': float(change),
+                    'change_percent': float(change_percent),
+                    'market_cap': quote.get('marketCap'),
+                    'volume': quote.get('regularMarketVolume'),
+                    'sector': 'Technology',  # Quote API doesn't provide sector either
+                    'timestamp': now.isoformat(),
+                    'source': 'yahoo_finance_quote_api',
+                    'day_high': float(quote.get('regularMarketDayHigh', current_price)),
+                    'day_low': float(quote.get('regularMarketDayLow', current_price)),
+                    'last_updated': now.isoformat()
+                }
+
+                # Cache so single-symbol get_live_price hits too
+                self.price_cache[symbol] = price_data
+                self.price_bytes[symbol] = orjson.dumps(price_data)
+                self.last_update[symbol] = now
+                fresh[symbol] = price_data
+                results[symbol] = price_data
+
+        await self._redis_set_prices(fresh)
+
+        # Symbols a successful quote request didn't return are bad/delisted -
+        # remember that so they aren't retried every tick
+        for symbol in answered:
+            if symbol not in results:
+                self.negative_until[symbol] = now + timedelta(seconds=self.negative_ttl)
+
+        logger.info(f"✅ Batched quotes: {len(results)}/{len(unique_symbols)} symbols in {len(chunks)} request(s)")
+        return results
+
+    async def update_stock_prices(self, symbols: List[str]) -> Dict[str, Any]:
+        """
+        Update prices for multiple stocks with batched quote requests.
+        Returns a dict of successful updates with REAL market data.
+        """
+        batch_results = await self.get_live_prices_batch(symbols)
+
+        # Key results by the caller's original symbol spelling
+        results = {}
+        for symbol in symbols:
+            price_data = batch_results.get(symbol.upper())
+            if price_data:
+                results[symbol] = price_data
             else:
                 logger.warning(f"No REAL data received for {symbol}")
-        
+
         return results
     
-    async def update_portfolio_values(self, db: AsyncSession):
+    async def update_portfolio_values(self, db: AsyncSession, portfolio_ids=None):
         """
-        Update all portfolio values with REAL current market prices.
+        Update portfolio values with REAL current market prices.
         This makes portfolios show LIVE P&L with actual market data.
+        When portfolio_ids is given, only those portfolios are recomputed.
         """
         try:
-            # Get all portfolios
-            portfolios_result = await db.execute(select(Portfolio.id))
-            portfolio_ids = [row[0] for row in portfolios_result.fetchall()]
-            
-            logger.info(f"🔄 Updating portfolio values for {len(portfolio_ids)} portfolios with REAL market data...")
-            
-            for portfolio_id in portfolio_ids:
-                # Get all positions for this portfolio
-                positions_result = await db.execute(
-                    select(Position).where(
-                        Position.portfolio_id == portfolio_id,
-                        Position.quantity > 0
-                    )
+            # One query for every active position across all portfolios
+            positions_query = select(Position).where(Position.quantity > 0)
+            if portfolio_ids is not None:
+                if not portfolio_ids:
+                    return
+                positions_query = positions_query.where(
+                    Position.portfolio_id.in_(portfolio_ids)
                 )
-                positions = positions_result.fetchall()
-                
-                if not positions:
-                    continue
-                
-                # Get unique symbols
-                symbols = list(set([pos.Position.symbol for pos in positions]))
-                
-                # Fetch REAL live prices for all symbols
-                live_prices = await self.update_stock_prices(symbols)
-                
-                if not live_prices:
-                    logger.warning(f"No REAL price data received for portfolio {portfolio_id}")
+            positions_result = await db.execute(positions_query)
+            positions = positions_result.scalars().all()
+
+            if not positions:
+                return
+
+            positions_by_portfolio = {}
+            for position in positions:
+                positions_by_portfolio.setdefault(position.portfolio_id, []).append(position)
+
+            logger.info(f"🔄 Updating portfolio values for {len(positions_by_portfolio)} portfolios with REAL market data...")
+
+            # Hit Yahoo once per tick with the union of all held symbols
+            all_symbols = list(set(position.symbol for position in positions))
+            live_prices = await self.update_stock_prices(all_symbols)
+
+            if not live_prices:
+                logger.warning("No REAL price data received for any portfolio")
+                return
+
+            # One query for the cash balances of the affected portfolios
+            cash_result = await db.execute(
+                select(Portfolio.id, Portfolio.cash_balance).where(
+                    Portfolio.id.in_(positions_by_portfolio.keys())
+                )
+            )
+            cash_balances = {row[0]: row[1] for row in cash_result.fetchall()}
+
+            # Collect every row change and flush them as two executemany
+            # statements instead of one UPDATE round-trip per row
+            update_time = datetime.now()
+            position_rows = []
+            portfolio_rows = []
+
+            for portfolio_id, portfolio_positions in positions_by_portfolio.items():
+                # One bad portfolio (corrupt price, odd position data) should
+                # not abort the whole tick - skip it and keep the rest
+                try:
+                    # Hot-loop math runs in integer cents - far cheaper than a
+                    # Decimal allocation per operation; Decimal only reappears
+                    # at bind time for the NUMERIC columns
+                    total_market_cents = 0
+                    queued_rows = []
+
+                    for position in portfolio_positions:
+                        symbol = position.symbol
+
+                        if symbol in live_prices:
+                            live_price = live_prices[symbol]
+                            price_cents = int(round(live_price['current_price'] * 100))
+
+                            # Calculate position values in cents
+                            market_value_cents = price_cents * position.quantity
+                            cost_basis_cents = int(position.average_cost * 100) * position.quantity
+                            unrealized_pnl_cents = market_value_cents - cost_basis_cents
+
+                            # Queue position update with REAL market data
+                            queued_rows.append({
+                                'id': position.id,
+                                'current_value': Decimal(market_value_cents) / 100,
+                                'unrealized_pnl': Decimal(unrealized_pnl_cents) / 100,
+                                'last_updated': update_time
+                            })
+
+                            total_market_cents += market_value_cents
+
+                            logger.info(f"📈 REAL UPDATE: {symbol} - {position.quantity} shares @ ${price_cents / 100:.2f} = ${market_value_cents / 100:.2f} (P&L: ${unrealized_pnl_cents / 100:.2f})")
+
+                    position_rows.extend(queued_rows)
+
+                    # Update portfolio total value
+                    if total_market_cents > 0 and portfolio_id in cash_balances:
+                        total_portfolio_value = cash_balances[portfolio_id] + Decimal(total_market_cents) / 100
+
+                        portfolio_rows.append({
+                            'id': portfolio_id,
+                            'total_value': total_portfolio_value,
+                            'updated_at': update_time
+                        })
+
+                        logger.info(f"💰 Portfolio {portfolio_id}: REAL total value = ${total_portfolio_value:.2f}")
+
+                except Exception as e:
+                    logger.error(f"🚨 Skipping portfolio {portfolio_id} this tick: {e}")
                     continue
-                
-                # Update each position with REAL live price
-                total_market_value = Decimal('0')
-                
-                for pos_row in positions:
-                    position = pos_row.Position
-                    symbol = position.symbol
-                    
-                    if symbol in live_prices:
-                        live_price = live_prices[symbol]
-                        current_price = Decimal(str(live_price['current_price']))
-                        
-                        # Calculate position values
-                        market_value = current_price * Decimal(str(position.quantity))
-                        cost_basis = position.average_cost * Decimal(str(position.quantity))
-                        unrealized_pnl = market_value - cost_basis
-                        
-                        # Update position with REAL market data
-                        await db.execute(
-                            update(Position).where(Position.id == position.id).values(
-                                current_value=market_value,
-                                unrealized_pnl=unrealized_pnl,
-                                last_updated=datetime.now()
-                            )
+
+            # Two bulk statements regardless of how many rows changed
+            pg_pool = await self._get_pg_pool()
+            if pg_pool is not None:
+                # Raw asyncpg executemany: one server-side prepared statement
+                # per table, no SQLAlchemy compile/bind work per tick
+                async with pg_pool.acquire() as conn:
+                    if position_rows:
+                        await conn.executemany(
+                            "UPDATE positions SET current_value = $1, "
+                            "unrealized_pnl = $2, last_updated = $3 WHERE id = $4",
+                            [(r['current_value'], r['unrealized_pnl'],
+                              r['last_updated'], r['id']) for r in position_rows]
                         )
-                        
-                        total_market_value += market_value
-                        
-                        logger.info(f"📈 REAL UPDATE: {symbol} - {position.quantity} shares @ ${current_price:.2f} = ${market_value:.2f} (P&L: ${unrealized_pnl:.2f})")
-                
-                # Update portfolio total value
-                if total_market_value > 0:
-                    portfolio_result = await db.execute(
-                        select(Portfolio).where(Portfolio.id == portfolio_id)
-                    )
-                    portfolio = portfolio_result.scalar_one()
-                    
-                    total_portfolio_value = portfolio.cash_balance + total_market_value
-                    
-                    await db.execute(
-                        update(Portfolio).where(Portfolio.id == portfolio_id).values(
-                            total_value=total_portfolio_value,
-                            updated_at=datetime.now()
+                    if portfolio_rows:
+                        await conn.executemany(
+                            "UPDATE portfolios SET total_value = $1, "
+                            "updated_at = $2 WHERE id = $3",
+                            [(r['total_value'], r['updated_at'], r['id'])
+                             for r in portfolio_rows]
                         )
-                    )
-                    
-                    logger.info(f"💰 Portfolio {portfolio_id}: REAL total value = ${total_portfolio_value:.2f}")
-            
-            await db.commit()
+            else:
+                # ORM bulk-UPDATE-by-primary-key: passing a plain update()
+                # with a list of dicts keyed by column name (including the
+                # pk) is the one executemany form the AsyncSession accepts
+                if position_rows:
+                    await db.execute(update(Position), position_rows)
+
+                if portfolio_rows:
+                    await db.execute(update(Portfolio), portfolio_rows)
+
+                await db.commit()
             logger.info("✅ ALL portfolio values updated with REAL LIVE market data!")
             
         except Exception as e:
@@ -267,9 +582,26 @@ class RealLiveDataService:
             await db.rollback()
             raise
     
+    async def _get_pg_pool(self):
+        """Lazily create the asyncpg pool used for the bulk tick UPDATEs."""
+        if asyncpg is None or engine.dialect.name != "postgresql":
+            return None
+
+        if self._pg_pool is None:
+            try:
+                dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+                self._pg_pool = await asyncpg.create_pool(dsn, min_size=1, max_size=4)
+            except Exception as e:
+                logger.warning(f"Could not create asyncpg pool, using ORM path: {e}")
+                return None
+
+        return self._pg_pool
+
     async def close(self):
         """Clean up resources."""
         await self.client.aclose()
+        if self._pg_pool is not None:
+            await self._pg_pool.close()
 
 # Global instance with REAL live data
 live_data_service = RealLiveDataService()
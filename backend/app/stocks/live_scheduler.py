@@ -19,7 +19,36 @@ class RobustLiveScheduler:
         self.is_running = False
         self.task = None
         self.update_interval = 15  # seconds
-        
+        # Portfolios touched by a trade since the last tick; most ticks only
+        # recompute these, with a periodic full sweep picking up price drift
+        self.dirty_portfolios = set()
+        self.full_sweep_every = 4  # every Nth tick recomputes everything
+        self._tick_count = 0
+
+    def mark_dirty(self, portfolio_id: int):
+        """Flag a portfolio for recomputation on the next scheduler tick."""
+        self.dirty_portfolios.add(portfolio_id)
+        if live_data_service.redis:
+            # Share with other workers' schedulers via Redis
+            asyncio.ensure_future(
+                live_data_service.redis.sadd("dirty_portfolios", portfolio_id)
+            )
+
+    async def _collect_dirty_portfolios(self):
+        """Drain the local and shared dirty sets for this tick."""
+        dirty = self.dirty_portfolios
+        self.dirty_portfolios = set()
+
+        if live_data_service.redis:
+            try:
+                shared = await live_data_service.redis.spop("dirty_portfolios", 1000)
+                if shared:
+                    dirty.update(int(pid) for pid in shared)
+            except Exception as e:
+                logger.warning(f"Redis dirty-set read failed: {e}")
+
+        return dirty
+
     async def fetch_and_update_live_data(self):
         """
         Core function that fetches LIVE market data and updates portfolios.
@@ -27,12 +56,22 @@ class RobustLiveScheduler:
         """
         try:
             logger.info("🔄 Starting live market data update...")
-            
+
+            # Full sweep every Nth tick; otherwise only dirty portfolios
+            self._tick_count += 1
+            if self._tick_count % self.full_sweep_every == 0:
+                portfolio_ids = None
+            else:
+                portfolio_ids = await self._collect_dirty_portfolios()
+                if not portfolio_ids:
+                    logger.info("✅ No dirty portfolios this tick - skipping recompute")
+                    return
+
             # Get database session
             async for db in get_db():
                 try:
-                    # Update all portfolio values with live market prices
-                    await live_data_service.update_portfolio_values(db)
+                    # Update portfolio values with live market prices
+                    await live_data_service.update_portfolio_values(db, portfolio_ids)
                     logger.info("✅ Live market data update completed successfully!")
                     break  # Exit the async generator
                 except Exception as e:
@@ -56,11 +95,30 @@ class RobustLiveScheduler:
         
         self.is_running = True
         logger.info(f"🚀 Starting LIVE market data updates every {self.update_interval} seconds...")
-        
+
         try:
+            # Deadline-based loop: ticks fire on a fixed monotonic cadence,
+            # and a slow tick drops the missed deadlines instead of letting
+            # overdue updates pile up back-to-back
+            loop = asyncio.get_running_loop()
+            next_tick = loop.time()
+
             while self.is_running:
-                await self.fetch_and_update_live_data()
-                await asyncio.sleep(self.update_interval)
+                next_tick += self.update_interval
+
+                try:
+                    await asyncio.wait_for(
+                        self.fetch_and_update_live_data(),
+                        timeout=self.update_interval * 2
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"⚠️ Live data update overran {self.update_interval * 2}s and was cancelled")
+
+                sleep_for = max(0, next_tick - loop.time())
+                if sleep_for == 0:
+                    # Previous tick overran - skip the missed deadlines
+                    next_tick = loop.time()
+                await asyncio.sleep(sleep_for)
         except asyncio.CancelledError:
             logger.info("⏹️ Live data scheduler cancelled")
         except Exception as e:
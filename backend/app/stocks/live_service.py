@@ -6,11 +6,16 @@ import asyncio
 import aiohttp
 import json
 import logging
+import random
+import time
+import types
+import numpy as np
+import orjson
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, text
 
 from ..database import Stock, Portfolio, Position
 from ..config import settings
@@ -18,6 +23,54 @@ from .schemas import StockInfo
 
 logger = logging.getLogger(__name__)
 
+# Base prices for common stocks (realistic market values as of 2024);
+# read-only view so nothing can mutate the shared table
+_BASE_PRICES = types.MappingProxyType({
+    'AAPL': 175.50,    # Apple
+    'MSFT': 340.20,    # Microsoft
+    'GOOGL': 125.30,   # Google/Alphabet
+    'AMZN': 145.80,    # Amazon
+    'TSLA': 185.45,    # Tesla
+    'NVDA': 875.20,    # NVIDIA
+    'META': 285.65,    # Meta/Facebook
+    'NFLX': 425.15,    # Netflix
+    'AMD': 105.75,     # AMD
+    'INTC': 25.80,     # Intel
+    'BABA': 85.40,     # Alibaba
+    'CRM': 220.30,     # Salesforce
+    'ORCL': 105.60     # Oracle
+})
+
+# Fixed dashboard watchlist - built once instead of per request
+_DASHBOARD_SYMBOLS = ["AAPL", "GOOGL", "MSFT", "AMZN", "TSLA", "NVDA", "META", "NFLX", "AMD"]
+
+
+def _revalue(qty: np.ndarray, avg: np.ndarray, price: np.ndarray) -> tuple:
+    """
+    Numeric core of a portfolio revaluation over float64 arrays.
+    Returns (market_value, pnl, total_market_value, total_pnl); NumPy
+    dispatches the multiply-accumulate to SIMD'd C loops.
+    """
+    market = qty * price
+    pnl = market - qty * avg
+    return market, pnl, float(market.sum()), float(pnl.sum())
+
+
+def _simulate(base_price: float, rng: random.Random = random) -> tuple:
+    """
+    Numeric kernel for one simulated quote.
+    Returns (current_price, change, change_percent, volume) from a base
+    price: intraday drift of +/-1.5% plus +/-0.5% noise.
+    """
+    pct = rng.uniform(-1.5, 1.5)
+    variation = rng.uniform(-0.005, 0.005)
+    current_price = round(base_price * (1 + pct / 100) * (1 + variation), 2)
+    change = round(current_price - base_price, 2)
+    change_percent = round((change / base_price) * 100, 2)
+    volume = rng.randint(1000000, 50000000)
+    return current_price, change, change_percent, volume
+
+
 class LiveStockService:
     """Service for fetching real-time stock data from multiple sources."""
     
@@ -31,186 +84,349 @@ class LiveStockService:
     TWELVEDATA_API_KEY = "your_twelvedata_key"  # Get free at twelvedata.com
     
     def __init__(self):
-        self.cache = {}
+        # symbol -> (monotonic fetch time, payload); entries younger than
+        # update_interval are served without touching the network
+        self.cache: Dict[str, tuple] = {}
         self.last_update = None
         self.update_interval = 15  # seconds
-        
-    @staticmethod
-    async def _fetch_yahoo_finance(symbol: str) -> Optional[Dict[str, Any]]:
+        self.stats = {"hits": 0, "misses": 0}
+        # In-flight fetches by symbol - concurrent cache-miss callers for
+        # the same symbol await one shared Future instead of all fetching
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Circuit breaker per source: name -> (consecutive_failures,
+        # monotonic time until which the source is skipped)
+        self._source_state: Dict[str, tuple] = {}
+        # Cap concurrent per-symbol fetches - keeps the connection pool
+        # warm without tripping upstream rate limits on big portfolios
+        self._sem = asyncio.Semaphore(8)
+        # One pooled session shared by all fetches - keep-alive means ~1
+        # TCP+TLS handshake per host instead of one per request
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the shared aiohttp session with connection pooling."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=20,
+                    ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session (called at application shutdown)."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def _fetch_yahoo_finance(self, symbol: str, session: aiohttp.ClientSession) -> Optional[Dict[str, Any]]:
         """Fetch stock data from Yahoo Finance (no API key required)."""
         try:
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if "chart" in data and data["chart"]["result"]:
-                            result = data["chart"]["result"][0]
-                            meta = result.get("meta", {})
-                            
-                            current_price = meta.get("regularMarketPrice")
-                            previous_close = meta.get("previousClose")
-                            
-                            if current_price and previous_close:
-                                return {
-                                    "symbol": symbol,
-                                    "price": current_price,
-                                    "previous_close": previous_close,
-                                    "change": current_price - previous_close,
-                                    "change_percent": ((current_price - previous_close) / previous_close) * 100,
-                                    "volume": meta.get("regularMarketVolume", 0),
-                                    "source": "yahoo"
-                                }
-        except Exception as e:
-            logger.error(f"Error fetching from Yahoo Finance for {symbol}: {e}")
-            return None
-    
-    @staticmethod
-    async def _fetch_finnhub(symbol: str) -> Optional[Dict[str, Any]]:
-        """Fetch stock data from Finnhub (requires free API key)."""
-        try:
-            url = f"https://finnhub.io/api/v1/quote?symbol={symbol}&token=demo"  # Using demo token
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if "c" in data and data["c"]:  # current price
-                            current_price = data["c"]
-                            previous_close = data.get("pc", current_price)
-                            
+            # Quote endpoint returns just the summary fields we read -
+            # the chart endpoint shipped whole intraday candle arrays
+            # (hundreds of KB) only to be thrown away after parsing
+            url = f"https://query1.finance.yahoo.com/v7/finance/quote?symbols={symbol}"
+
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+
+                    for quote in data.get("quoteResponse", {}).get("result", []):
+                        current_price = quote.get("regularMarketPrice")
+                        previous_close = quote.get("regularMarketPreviousClose")
+
+                        if current_price and previous_close:
                             return {
                                 "symbol": symbol,
                                 "price": current_price,
                                 "previous_close": previous_close,
                                 "change": current_price - previous_close,
-                                "change_percent": ((current_price - previous_close) / previous_close) * 100 if previous_close else 0,
-                                "volume": 0,
-                                "source": "finnhub"
+                                "change_percent": ((current_price - previous_close) / previous_close) * 100,
+                                "volume": quote.get("regularMarketVolume", 0),
+                                "source": "yahoo"
                             }
+        except Exception as e:
+            logger.error(f"Error fetching from Yahoo Finance for {symbol}: {e}")
+            return None
+
+    async def _fetch_finnhub(self, symbol: str, session: aiohttp.ClientSession) -> Optional[Dict[str, Any]]:
+        """Fetch stock data from Finnhub (requires free API key)."""
+        try:
+            url = f"https://finnhub.io/api/v1/quote?symbol={symbol}&token=demo"  # Using demo token
+
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+
+                    if "c" in data and data["c"]:  # current price
+                        current_price = data["c"]
+                        previous_close = data.get("pc", current_price)
+
+                        return {
+                            "symbol": symbol,
+                            "price": current_price,
+                            "previous_close": previous_close,
+                            "change": current_price - previous_close,
+                            "change_percent": ((current_price - previous_close) / previous_close) * 100 if previous_close else 0,
+                            "volume": 0,
+                            "source": "finnhub"
+                        }
         except Exception as e:
             logger.error(f"Error fetching from Finnhub for {symbol}: {e}")
             return None
-    
-    @staticmethod
-    async def _fetch_iex_cloud(symbol: str) -> Optional[Dict[str, Any]]:
+
+    async def _fetch_iex_cloud(self, symbol: str, session: aiohttp.ClientSession) -> Optional[Dict[str, Any]]:
         """Fetch stock data from IEX Cloud (free tier available)."""
         try:
             # IEX Cloud has a free tier with delayed data
             url = f"https://cloud.iexapis.com/stable/stock/{symbol}/quote?token=pk_test"  # Test token
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        current_price = data.get("latestPrice")
-                        previous_close = data.get("previousClose")
-                        
-                        if current_price and previous_close:
-                            return {
-                                "symbol": symbol,
-                                "price": current_price,
-                                "previous_close": previous_close,
-                                "change": data.get("change", 0),
-                                "change_percent": data.get("changePercent", 0) * 100,
-                                "volume": data.get("latestVolume", 0),
-                                "source": "iex"
-                            }
+
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+
+                    current_price = data.get("latestPrice")
+                    previous_close = data.get("previousClose")
+
+                    if current_price and previous_close:
+                        return {
+                            "symbol": symbol,
+                            "price": current_price,
+                            "previous_close": previous_close,
+                            "change": data.get("change", 0),
+                            "change_percent": data.get("changePercent", 0) * 100,
+                            "volume": data.get("latestVolume", 0),
+                            "source": "iex"
+                        }
         except Exception as e:
             logger.error(f"Error fetching from IEX Cloud for {symbol}: {e}")
             return None
-    
+
+    # Source chain in order of preference, built once at class creation
+    # instead of a fresh list per fetch
+    _SOURCES = (
+        _fetch_yahoo_finance,
+        _fetch_finnhub,
+        _fetch_iex_cloud,
+    )
+
     async def fetch_live_price(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Fetch live price from multiple sources with realistic simulation fallback."""
         symbol = symbol.upper()
-        
-        # Try multiple sources in order of preference
-        sources = [
-            self._fetch_yahoo_finance,
-            self._fetch_finnhub,
-            self._fetch_iex_cloud,
+
+        # Serve from the TTL cache - overlapping dashboard refreshes and
+        # portfolios sharing a symbol collapse to one upstream request
+        cached = self.cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < self.update_interval:
+            self.stats["hits"] += 1
+            return cached[1]
+        self.stats["misses"] += 1
+
+        # Coalesce concurrent requests: if a fetch for this symbol is
+        # already running, wait for its result
+        fut = self._inflight.get(symbol)
+        if fut is not None:
+            return await fut
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[symbol] = fut
+        data = None
+        try:
+            data = await self._fetch_uncached(symbol)
+        finally:
+            del self._inflight[symbol]
+            fut.set_result(data)
+        return data
+
+    def _source_open(self, name: str) -> bool:
+        """True while a source's circuit is open (recently dead, skip it)."""
+        return self._source_state.get(name, (0, 0.0))[1] > time.monotonic()
+
+    def _record_source_result(self, name: str, ok: bool):
+        """Track consecutive failures; 3 in a row opens the circuit for 60s."""
+        if ok:
+            self._source_state[name] = (0, 0.0)
+            return
+        failures = self._source_state.get(name, (0, 0.0))[0] + 1
+        open_until = 0.0
+        if failures >= 3:
+            open_until = time.monotonic() + 60
+            logger.warning(f"Source {name} failed {failures}x in a row - skipping it for 60s")
+        self._source_state[name] = (failures, open_until)
+
+    async def _fetch_uncached(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Race all sources for one symbol and fill the cache."""
+        session = await self._get_session()
+
+        # Query every source concurrently and take the first success -
+        # latency is min(source latencies) instead of their sum when an
+        # earlier source is slow or dead
+        async def guarded(name, source_func):
+            data = await source_func(self, symbol, session)
+            self._record_source_result(name, bool(data))
+            return data
+
+        # Sources with an open circuit don't even get a task - a dead
+        # endpoint costs nothing instead of a 10s timeout per call
+        tasks = [
+            asyncio.create_task(guarded(source_func.__name__, source_func))
+            for source_func in self._SOURCES
+            if not self._source_open(source_func.__name__)
         ]
-        
-        for source_func in sources:
-            try:
-                data = await source_func(symbol)
+
+        try:
+            for coro in asyncio.as_completed(tasks):
+                try:
+                    data = await coro
+                except Exception as e:
+                    logger.warning(f"Source failed for {symbol}: {e}")
+                    continue
                 if data:
                     logger.info(f"Successfully fetched {symbol} from {data['source']}")
+                    self.cache[symbol] = (time.monotonic(), data)
                     return data
-            except Exception as e:
-                logger.warning(f"Source failed for {symbol}: {e}")
-                continue
-        
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
         # If all APIs fail, generate realistic simulated data
         logger.info(f"All APIs failed for {symbol}, using simulated data")
-        return self._generate_realistic_price(symbol)
+        data = self._generate_realistic_price(symbol)
+        self.cache[symbol] = (time.monotonic(), data)
+        return data
     
     def _generate_realistic_price(self, symbol: str) -> Dict[str, Any]:
         """Generate realistic simulated stock prices based on typical market behavior."""
-        import random
-        import time
-        
-        # Base prices for common stocks (realistic market values as of 2024)
-        base_prices = {
-            'AAPL': 175.50,    # Apple
-            'MSFT': 340.20,    # Microsoft  
-            'GOOGL': 125.30,   # Google/Alphabet
-            'AMZN': 145.80,    # Amazon
-            'TSLA': 185.45,    # Tesla
-            'NVDA': 875.20,    # NVIDIA
-            'META': 285.65,    # Meta/Facebook
-            'NFLX': 425.15,    # Netflix
-            'AMD': 105.75,     # AMD
-            'INTC': 25.80,     # Intel
-            'BABA': 85.40,     # Alibaba
-            'CRM': 220.30,     # Salesforce
-            'ORCL': 105.60     # Oracle
-        }
-        
+        # Seed per (symbol, interval bucket) so repeated fallback calls
+        # within one update window return the same coherent price instead
+        # of jumping on every refresh
+        bucket = int(time.time()) // self.update_interval
+        rng = random.Random(hash((symbol, bucket)))
+
         # Get base price or generate one for unknown symbols
-        base_price = base_prices.get(symbol, random.uniform(50, 300))
-        
-        # Generate realistic intraday price movement (-1.5% to +1.5% from base)
-        price_change_percent = random.uniform(-1.5, 1.5)
-        current_price = base_price * (1 + price_change_percent / 100)
-        
-        # Round to 2 decimal places
-        current_price = round(current_price, 2)
-        
-        # Calculate previous close (use base price as previous close)
-        previous_close = base_price
-        
-        # Add small random variation to make it look more realistic each time
-        variation = random.uniform(-0.005, 0.005)  # ±0.5% additional variation
-        current_price = round(current_price * (1 + variation), 2)
-        
+        base_price = _BASE_PRICES.get(symbol) or rng.uniform(50, 300)
+
+        # All the arithmetic lives in the module-level _simulate kernel;
+        # only the dict construction stays here
+        current_price, change, change_percent, volume = _simulate(base_price, rng)
+
         return {
             'symbol': symbol,
             'price': current_price,
-            'previous_close': previous_close,
-            'change': round(current_price - previous_close, 2),
-            'change_percent': round(((current_price - previous_close) / previous_close) * 100, 2),
-            'volume': random.randint(1000000, 50000000),
+            'previous_close': base_price,
+            'change': change,
+            'change_percent': change_percent,
+            'volume': volume,
             'timestamp': int(time.time()),
             'source': 'Simulated Live Data'
         }
-    
+
+    def _generate_realistic_prices(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Generate simulated prices for many symbols in one vectorized pass."""
+        # Same bucketed seeding as the scalar path: identical symbol lists
+        # within one update window produce identical prices
+        bucket = int(time.time()) // self.update_interval
+        rng = np.random.default_rng(abs(hash((tuple(symbols), bucket))))
+        n = len(symbols)
+
+        # Draw all random variates in a few NumPy calls instead of ~10
+        # interpreted ops per symbol
+        base = np.array([_BASE_PRICES.get(s, rng.uniform(50, 300)) for s in symbols])
+        pct = rng.uniform(-1.5, 1.5, size=n)
+        variation = rng.uniform(-0.005, 0.005, size=n)
+        price = np.round(base * (1 + pct / 100) * (1 + variation), 2)
+        change = np.round(price - base, 2)
+        change_percent = np.round(change / base * 100, 2)
+        volume = rng.integers(1000000, 50000000, size=n)
+        timestamp = int(time.time())
+
+        return {
+            symbol: {
+                'symbol': symbol,
+                'price': float(price[i]),
+                'previous_close': float(base[i]),
+                'change': float(change[i]),
+                'change_percent': float(change_percent[i]),
+                'volume': int(volume[i]),
+                'timestamp': timestamp,
+                'source': 'Simulated Live Data'
+            }
+            for i, symbol in enumerate(symbols)
+        }
+
+    async def _fetch_yahoo_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch a whole batch of symbols from Yahoo's multi-quote endpoint."""
+        session = await self._get_session()
+        url = f"https://query1.finance.yahoo.com/v7/finance/quote?symbols={','.join(symbols)}"
+
+        batch_data = {}
+        async with session.get(url) as response:
+            if response.status != 200:
+                return batch_data
+            data = orjson.loads(await response.read())
+
+        for quote in data.get("quoteResponse", {}).get("result", []):
+            symbol = quote.get("symbol")
+            current_price = quote.get("regularMarketPrice")
+            previous_close = quote.get("regularMarketPreviousClose")
+            if not symbol or not current_price or not previous_close:
+                continue
+
+            batch_data[symbol.upper()] = {
+                "symbol": symbol.upper(),
+                "price": current_price,
+                "previous_close": previous_close,
+                "change": current_price - previous_close,
+                "change_percent": ((current_price - previous_close) / previous_close) * 100,
+                "volume": quote.get("regularMarketVolume", 0),
+                "source": "yahoo_batch"
+            }
+
+        return batch_data
+
     async def fetch_multiple_stocks(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
-        """Fetch live prices for multiple stocks concurrently."""
-        tasks = [self.fetch_live_price(symbol) for symbol in symbols]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
+        """Fetch live prices for multiple stocks with batched quote requests."""
         stock_data = {}
-        for symbol, result in zip(symbols, results):
-            if isinstance(result, dict) and result:
-                stock_data[symbol.upper()] = result
-            else:
-                logger.warning(f"Failed to fetch data for {symbol}")
-        
+        unique_symbols = list(dict.fromkeys(s.upper() for s in symbols))
+
+        # One multi-symbol quote request per 50 symbols replaces one chart
+        # request per symbol
+        try:
+            for start in range(0, len(unique_symbols), 50):
+                chunk = unique_symbols[start:start + 50]
+                batch = await self._fetch_yahoo_batch(chunk)
+                stock_data.update(batch)
+                now = time.monotonic()
+                for symbol, data in batch.items():
+                    self.cache[symbol] = (now, data)
+        except Exception as e:
+            logger.warning(f"Batch quote request failed: {e}")
+
+        # Per-symbol fallback chain only for symbols the batch missed
+        missing = [s for s in unique_symbols if s not in stock_data]
+        if missing:
+            async def guarded(symbol):
+                async with self._sem:
+                    return await self.fetch_live_price(symbol)
+
+            tasks = [guarded(symbol) for symbol in missing]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+            failed = []
+            for symbol, result in zip(missing, results):
+                if isinstance(result, dict) and result:
+                    stock_data[symbol] = result
+                else:
+                    logger.warning(f"Failed to fetch data for {symbol}")
+                    failed.append(symbol)
+
+            # Simulate whatever is still missing in one vectorized pass
+            if failed:
+                stock_data.update(self._generate_realistic_prices(failed))
+
         return stock_data
     
     async def get_portfolio_stocks(self, db: AsyncSession, portfolio_id: int) -> List[str]:
@@ -225,55 +441,124 @@ class LiveStockService:
     
     async def get_dashboard_stocks(self) -> List[str]:
         """Get stocks displayed on dashboard."""
-        return ["AAPL", "GOOGL", "MSFT", "AMZN", "TSLA", "NVDA", "META", "NFLX", "AMD"]
+        # Async signature kept for API compatibility; callers that don't
+        # need the await can read _DASHBOARD_SYMBOLS directly
+        return _DASHBOARD_SYMBOLS
     
+    async def _update_positions_in_db(self, db: AsyncSession, portfolio_id: int, lp: Dict[str, Dict[str, Any]]):
+        """
+        Postgres-only revaluation: feed (symbol, price) as a VALUES table
+        and let one UPDATE ... FROM compute every position's value and P&L
+        next to the data. Returns (total_market_value, total_unrealized_pnl).
+        """
+        params = {"pid": portfolio_id}
+        values_rows = []
+        for i, (symbol, live_data) in enumerate(lp.items()):
+            params[f"s{i}"] = symbol
+            params[f"p{i}"] = float(live_data['price'])
+            values_rows.append(f"(:s{i}, CAST(:p{i} AS numeric))")
+
+        stmt = text(
+            "UPDATE positions AS p "
+            "SET current_value = p.quantity * pr.price, "
+            "    unrealized_pnl = p.quantity * (pr.price - p.average_cost) "
+            f"FROM (VALUES {', '.join(values_rows)}) AS pr(symbol, price) "
+            "WHERE upper(p.symbol) = pr.symbol "
+            "  AND p.portfolio_id = :pid "
+            "  AND p.quantity > 0 "
+            "RETURNING p.current_value, p.unrealized_pnl"
+        )
+        result = await db.execute(stmt, params)
+        rows = result.fetchall()
+        return (
+            float(sum(row[0] for row in rows)),
+            float(sum(row[1] for row in rows))
+        )
+
     async def update_portfolio_values(self, db: AsyncSession, portfolio_id: int, live_prices: Dict[str, Dict[str, Any]]):
         """Update portfolio positions with live prices and calculate P&L."""
         try:
-            # Get all positions for this portfolio
+            # Normalize price keys once up front
+            lp = {k.upper(): v for k, v in live_prices.items()}
+
+            # On Postgres the whole revaluation runs in-database: one
+            # round trip, no position rows fetched into Python at all
+            if lp and db.get_bind().dialect.name == "postgresql":
+                total_market_value, total_unrealized_pnl = (
+                    await self._update_positions_in_db(db, portfolio_id, lp)
+                )
+                await self._update_portfolio_totals(db, portfolio_id, total_market_value, total_unrealized_pnl)
+                return
+
+            # Fetch only the four columns the revaluation needs as Row
+            # tuples - no mapper objects or identity-map bookkeeping
             result = await db.execute(
-                select(Position).where(Position.portfolio_id == portfolio_id)
-            )
-            positions = result.scalars().all()
-            
-            total_market_value = Decimal('0')
-            total_unrealized_pnl = Decimal('0')
-            
-            for position in positions:
-                symbol = position.symbol.upper()
-                if symbol in live_prices:
-                    live_data = live_prices[symbol]
-                    current_price = Decimal(str(live_data['price']))
-                    
-                    # Calculate cost basis from quantity * average_cost
-                    cost_basis = position.quantity * position.average_cost
-                    
-                    # Update position with live price
-                    position.current_value = position.quantity * current_price
-                    position.unrealized_pnl = position.current_value - cost_basis
-                    
-                    total_market_value += position.current_value
-                    total_unrealized_pnl += position.unrealized_pnl
-            
-            # Update portfolio totals
-            portfolio_result = await db.execute(
-                select(Portfolio).where(Portfolio.id == portfolio_id)
+                select(
+                    Position.id,
+                    Position.symbol,
+                    Position.quantity,
+                    Position.average_cost
+                ).where(
+                    Position.portfolio_id == portfolio_id,
+                    Position.quantity > 0
+                )
             )
-            portfolio = portfolio_result.scalar_one_or_none()
-            
-            if portfolio:
-                portfolio.total_market_value = float(total_market_value)
-                portfolio.total_portfolio_value = portfolio.cash_balance + float(total_market_value)
-                portfolio.total_unrealized_pnl = float(total_unrealized_pnl)
-                portfolio.total_unrealized_pnl_percent = float((total_unrealized_pnl / Decimal(str(portfolio.cash_balance + float(total_market_value)))) * 100) if portfolio.total_portfolio_value > 0 else 0
-            
-            await db.commit()
-            logger.info(f"Updated portfolio {portfolio_id} with live prices")
-            
+            positions = result.all()
+
+            # Uppercase each position symbol once, instead of
+            # re-uppercasing inside every lookup
+            priced = [
+                (p, lp[sym]) for p in positions
+                if (sym := p.symbol.upper()) in lp
+            ]
+            total_market_value = 0.0
+            total_unrealized_pnl = 0.0
+
+            if priced:
+                qty = np.fromiter((p.quantity for p, _ in priced), dtype=np.float64)
+                avg = np.fromiter((float(p.average_cost) for p, _ in priced), dtype=np.float64)
+                cur = np.fromiter(
+                    (float(live_data['price']) for _, live_data in priced),
+                    dtype=np.float64
+                )
+
+                market, pnl, total_market_value, total_unrealized_pnl = _revalue(qty, avg, cur)
+
+                # One executemany UPDATE by primary key instead of N dirty
+                # ORM rows flushing one statement each
+                rows = [
+                    {
+                        "id": p.id,
+                        "current_value": float(market[i]),
+                        "unrealized_pnl": float(pnl[i])
+                    }
+                    for i, (p, _) in enumerate(priced)
+                ]
+                await db.execute(update(Position), rows)
+
+            await self._update_portfolio_totals(db, portfolio_id, total_market_value, total_unrealized_pnl)
+
         except Exception as e:
             logger.error(f"Error updating portfolio values: {e}")
             await db.rollback()
 
+    async def _update_portfolio_totals(self, db: AsyncSession, portfolio_id: int, total_market_value: float, total_unrealized_pnl: float):
+        """Write the aggregated totals to the portfolio row and commit."""
+        portfolio_result = await db.execute(
+            select(Portfolio).where(Portfolio.id == portfolio_id)
+        )
+        portfolio = portfolio_result.scalar_one_or_none()
+
+        if portfolio:
+            total_portfolio_value = float(portfolio.cash_balance) + total_market_value
+            portfolio.total_market_value = total_market_value
+            portfolio.total_portfolio_value = total_portfolio_value
+            portfolio.total_unrealized_pnl = total_unrealized_pnl
+            portfolio.total_unrealized_pnl_percent = (total_unrealized_pnl / total_portfolio_value) * 100 if total_portfolio_value > 0 else 0
+
+        await db.commit()
+        logger.info(f"Updated portfolio {portfolio_id} with live prices")
+
 
 # Global instance
 live_stock_service = LiveStockService()
@@ -2,9 +2,16 @@
 ROBUST Stock Services for TradePulse
 Provides REAL live stock data for trading operations.
 """
+import asyncio
+import bisect
+import heapq
 import logging
+import random
+import time
+import numpy as np
 from datetime import datetime, timedelta
 from decimal import Decimal
+from functools import lru_cache
 from typing import Optional, List, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
@@ -12,9 +19,156 @@ from sqlalchemy import select, update
 from ..database import Stock
 from .schemas import StockInfo, StockHistory, MarketMover
 from .live_data_service import live_data_service
+from .services import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Process-wide TTL cache for get_stock_info. Dashboard endpoints ask for
+# the same symbols dozens of times per request chain, so repeats within
+# the TTL skip the live-data layer (and its schema conversion) entirely.
+# Bounded LRU (same TTLCache as the Alpha Vantage response cache):
+# search_stocks probes arbitrary user queries across exchange suffixes,
+# so an unbounded dict would grow with search traffic.
+_STOCK_INFO_TTL = 10  # seconds
+_stock_info_cache = TTLCache(maxsize=512)
+
+# Single-flight gate: symbol -> Future for a fetch already in progress,
+# so concurrent misses coalesce into one upstream call per TTL window
+_stock_info_inflight: Dict[str, asyncio.Future] = {}
+
+
+# Searchable catalog of popular stocks, built once at import
+_POPULAR_STOCKS = {
+    # US Stocks
+    'AAPL': 'Apple Inc.', 'MSFT': 'Microsoft Corp', 'GOOGL': 'Alphabet Inc',
+    'AMZN': 'Amazon.com Inc', 'TSLA': 'Tesla Inc', 'META': 'Meta Platforms',
+    'NVDA': 'NVIDIA Corp', 'NFLX': 'Netflix Inc', 'AMD': 'Advanced Micro Devices',
+    'JPM': 'JPMorgan Chase', 'BAC': 'Bank of America', 'WMT': 'Walmart Inc',
+    'JNJ': 'Johnson & Johnson', 'PG': 'Procter & Gamble', 'DIS': 'Walt Disney',
+
+    # Indian Stocks (NSE)
+    'RELIANCE.NS': 'Reliance Industries', 'TCS.NS': 'Tata Consultancy Services',
+    'HDFCBANK.NS': 'HDFC Bank', 'INFY.NS': 'Infosys Limited', 'ITC.NS': 'ITC Limited',
+    'ICICIBANK.NS': 'ICICI Bank', 'HINDUNILVR.NS': 'Hindustan Unilever',
+    'LT.NS': 'Larsen & Toubro', 'SBIN.NS': 'State Bank of India',
+    'BHARTIARTL.NS': 'Bharti Airtel', 'ASIANPAINT.NS': 'Asian Paints',
+    'MARUTI.NS': 'Maruti Suzuki', 'BAJFINANCE.NS': 'Bajaj Finance',
+    'WIPRO.NS': 'Wipro Limited', 'ULTRACEMCO.NS': 'UltraTech Cement',
+
+    # European Stocks
+    'ASML.AS': 'ASML Holding', 'SAP.F': 'SAP SE', 'TSCO.L': 'Tesco PLC',
+
+    # Other Global
+    'SHOP.TO': 'Shopify Inc', 'CBA.AX': 'Commonwealth Bank', '700.HK': 'Tencent'
+}
+
+# Sorted symbol list so prefix matches resolve with one bisect instead
+# of scanning the whole catalog per request
+_POPULAR_SYMBOLS_SORTED = sorted(_POPULAR_STOCKS)
+
+# Items tuple with names pre-uppercased, so the substring scan does no
+# per-iteration .upper() or dict-view allocation
+_POPULAR_ITEMS = tuple((symbol, name.upper()) for symbol, name in _POPULAR_STOCKS.items())
+
+# Yahoo Finance exchange suffixes probed for direct symbol lookups
+_YF_SUFFIXES = (
+    "",       # Direct US symbol (AAPL)
+    ".NS",    # NSE India (RELIANCE.NS)
+    ".BO",    # BSE India (RELIANCE.BO)
+    ".L",     # London (TSCO.L)
+    ".TO",    # Toronto (SHOP.TO)
+    ".AX",    # Australia (CBA.AX)
+    ".HK",    # Hong Kong (700.HK)
+    ".T",     # Tokyo (7203.T)
+    ".F",     # Frankfurt (SAP.F)
+)
+
+
+# Exact symbol -> sentiment-bucket map for index classification
+_INDEX_MAP = {
+    '^NSEI': 'nifty',         # Nifty 50
+    '^BSESN': 'sensex',       # BSE Sensex
+    '^NSEBANK': 'bank_nifty', # Bank Nifty
+    '^CNXIT': 'it',           # Nifty IT
+}
+
+
+def _popular_prefix_matches(prefix: str) -> List[str]:
+    """All catalog symbols starting with prefix, via O(log N) bisect."""
+    start = bisect.bisect_left(_POPULAR_SYMBOLS_SORTED, prefix)
+    matches = []
+    for i in range(start, len(_POPULAR_SYMBOLS_SORTED)):
+        if not _POPULAR_SYMBOLS_SORTED[i].startswith(prefix):
+            break
+        matches.append(_POPULAR_SYMBOLS_SORTED[i])
+    return matches
+
+
+@lru_cache(maxsize=512)
+def _estimated_technicals(symbol: str, trend: str, bucket: int) -> tuple:
+    """
+    Deterministic fallback indicators for (symbol, trend), memoized per
+    minute bucket. Repeat requests for the same symbol within a minute
+    become one dict lookup instead of re-running the hash arithmetic.
+    Returns (rsi, macd, signal, sma20_factor, sma50_factor) - the SMA
+    factors still get scaled by the caller's live price.
+    """
+    price_hash = hash(symbol) % 1000  # Use symbol hash for consistency
+
+    if trend == 'BULLISH':
+        rsi = 45 + (20 * (price_hash % 100) / 100)  # 45-65 range
+        macd = 5 + (10 * (price_hash % 50) / 50)    # 5-15 range
+        signal = 'BUY' if rsi < 55 else 'HOLD_BULLISH'
+    elif trend == 'BEARISH':
+        rsi = 25 + (20 * (price_hash % 100) / 100)  # 25-45 range
+        macd = -15 + (10 * (price_hash % 50) / 50)  # -15 to -5 range
+        signal = 'SELL' if rsi > 35 else 'HOLD_BEARISH'
+    else:  # NEUTRAL
+        rsi = 40 + (20 * (price_hash % 100) / 100)  # 40-60 range
+        macd = -5 + (10 * (price_hash % 50) / 50)   # -5 to 5 range
+        signal = 'HOLD'
+
+    # SMA variance factors around the live price
+    sma20_factor = 0.98 + 0.04 * ((price_hash % 25) / 25)
+    sma50_factor = 0.96 + 0.08 * ((price_hash % 30) / 30)
+
+    return rsi, macd, signal, sma20_factor, sma50_factor
+
+
+def _rsi_np(prices: np.ndarray, period: int = 14) -> float:
+    """Simple RSI over a float64 price array (neutral 50 when too short)."""
+    if prices.size < period + 1:
+        return 50.0
+
+    diffs = np.diff(prices)
+    gains = np.where(diffs > 0, diffs, 0.0)
+    losses = np.where(diffs < 0, -diffs, 0.0)
+
+    avg_gain = gains[-period:].mean()
+    avg_loss = losses[-period:].mean()
+    if avg_loss == 0:
+        return 100.0
+
+    rs = avg_gain / avg_loss
+    return float(100 - 100 / (1 + rs))
+
+
+def _ema_np(prices: np.ndarray, period: int) -> float:
+    """
+    EMA as one weighted dot product: the recurrence
+    ema = price * m + ema * (1 - m) unrolls into decayed weights, so a
+    single vectorized np.dot replaces the per-price Python loop.
+    """
+    if prices.size < period:
+        return float(prices[-1])
+
+    m = 2.0 / (period + 1)
+    decay = (1.0 - m) ** np.arange(prices.size - 1, -1, -1)
+    weights = m * decay
+    weights[0] = decay[0]  # the seed price keeps its full decayed weight
+    return float(np.dot(weights, prices))
+
+
 class RobustStockService:
     """Service for fetching REAL live stock data for trading operations."""
     
@@ -25,34 +179,94 @@ class RobustStockService:
         This is what powers your trading with REAL stock prices!
         """
         try:
-            # Get live data from our robust service
-            live_data = await live_data_service.get_live_price(symbol)
-            
-            if not live_data:
-                logger.error(f"❌ No live data available for {symbol}")
-                return None
-            
-            # Convert to StockInfo schema
-            stock_info = StockInfo(
-                symbol=live_data['symbol'],
-                name=live_data['name'],
-                current_price=live_data['current_price'],
-                previous_close=live_data['previous_close'],
-                change=live_data.get('change', 0),  # Add absolute change amount
-                change_percent=live_data['change_percent'],
-                market_cap=live_data.get('market_cap'),
-                volume=live_data.get('volume'),
-                sector=live_data.get('sector', 'Technology'),
-                last_updated=datetime.now()
-            )
-            
-            logger.info(f"✅ Got LIVE data for {symbol}: ${stock_info.current_price:.2f}")
-            return stock_info
-            
+            cache_key = symbol.upper()
+            cached = _stock_info_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            # Single-flight: concurrent requests for the same symbol ride
+            # one upstream fetch instead of each issuing their own
+            inflight = _stock_info_inflight.get(cache_key)
+            if inflight is not None:
+                return await inflight
+
+            future = asyncio.get_running_loop().create_future()
+            _stock_info_inflight[cache_key] = future
+
+            stock_info = None
+            try:
+                stock_info = await RobustStockService._fetch_stock_info(symbol, cache_key)
+                return stock_info
+            finally:
+                _stock_info_inflight.pop(cache_key, None)
+                future.set_result(stock_info)
+
         except Exception as e:
             logger.error(f"🚨 Error getting stock info for {symbol}: {e}")
             return None
+
+    @staticmethod
+    async def _fetch_stock_info(symbol: str, cache_key: str) -> Optional[StockInfo]:
+        """Uncached fetch + conversion behind the single-flight gate."""
+        # Get live data from our robust service
+        live_data = await live_data_service.get_live_price(symbol)
+
+        if not live_data:
+            logger.error(f"❌ No live data available for {symbol}")
+            return None
+
+        # Convert to StockInfo schema. live_data comes from our own
+        # trusted pipeline, so model_construct skips per-field
+        # validation that otherwise runs dozens of times per request
+        stock_info = StockInfo.model_construct(
+            symbol=live_data['symbol'],
+            name=live_data['name'],
+            current_price=live_data['current_price'],
+            previous_close=live_data['previous_close'],
+            change=live_data.get('change', 0),  # Add absolute change amount
+            change_percent=live_data['change_percent'],
+            market_cap=live_data.get('market_cap'),
+            volume=live_data.get('volume'),
+            sector=live_data.get('sector', 'Technology'),
+            last_updated=datetime.now()
+        )
+
+        _stock_info_cache.set(cache_key, stock_info, _STOCK_INFO_TTL)
+        logger.info("✅ Got LIVE data for %s: $%.2f", symbol, stock_info.current_price)
+        return stock_info
     
+    @staticmethod
+    async def get_stock_infos(symbols: List[str]) -> Dict[str, StockInfo]:
+        """
+        Get LIVE stock information for many symbols in one batched call.
+        One upstream round-trip serves every caller instead of one per symbol.
+        """
+        try:
+            live_results = await live_data_service.update_stock_prices(symbols)
+
+            stock_infos = {}
+            for symbol, live_data in live_results.items():
+                # Same trusted-source shortcut as get_stock_info
+                stock_infos[symbol] = StockInfo.model_construct(
+                    symbol=live_data['symbol'],
+                    name=live_data['name'],
+                    current_price=live_data['current_price'],
+                    previous_close=live_data['previous_close'],
+                    change=live_data.get('change', 0),
+                    change_percent=live_data['change_percent'],
+                    market_cap=live_data.get('market_cap'),
+                    volume=live_data.get('volume'),
+                    sector=live_data.get('sector', 'Technology'),
+                    last_updated=datetime.now()
+                )
+
+            logger.info("✅ Got LIVE data for %d/%d symbols in one batch", len(stock_infos), len(symbols))
+            return stock_infos
+
+        except Exception as e:
+            logger.error(f"🚨 Error getting batched stock info: {e}")
+            return {}
+
     @staticmethod
     async def search_stocks(query: str, limit: int = 10) -> List[StockInfo]:
         """
@@ -66,76 +280,50 @@ class RobustStockService:
                 return []
             
             # Step 1: Direct symbol lookup with Yahoo Finance suffixes
-            direct_symbols = [
-                query_upper,                      # Direct US symbol (AAPL)
-                f"{query_upper}.NS",             # NSE India (RELIANCE.NS)
-                f"{query_upper}.BO",             # BSE India (RELIANCE.BO) 
-                f"{query_upper}.L",              # London (TSCO.L)
-                f"{query_upper}.TO",             # Toronto (SHOP.TO)
-                f"{query_upper}.AX",             # Australia (CBA.AX)
-                f"{query_upper}.HK",             # Hong Kong (700.HK)
-                f"{query_upper}.T",              # Tokyo (7203.T)
-                f"{query_upper}.F",              # Frankfurt (SAP.F)
-            ]
-            
-            # Step 2: Try common variations and popular stocks
-            search_candidates = direct_symbols.copy()
-            
-            # Add popular stocks that match the query
-            popular_stocks = {
-                # US Stocks
-                'AAPL': 'Apple Inc.', 'MSFT': 'Microsoft Corp', 'GOOGL': 'Alphabet Inc', 
-                'AMZN': 'Amazon.com Inc', 'TSLA': 'Tesla Inc', 'META': 'Meta Platforms',
-                'NVDA': 'NVIDIA Corp', 'NFLX': 'Netflix Inc', 'AMD': 'Advanced Micro Devices',
-                'JPM': 'JPMorgan Chase', 'BAC': 'Bank of America', 'WMT': 'Walmart Inc',
-                'JNJ': 'Johnson & Johnson', 'PG': 'Procter & Gamble', 'DIS': 'Walt Disney',
-                
-                # Indian Stocks (NSE)
-                'RELIANCE.NS': 'Reliance Industries', 'TCS.NS': 'Tata Consultancy Services',
-                'HDFCBANK.NS': 'HDFC Bank', 'INFY.NS': 'Infosys Limited', 'ITC.NS': 'ITC Limited',
-                'ICICIBANK.NS': 'ICICI Bank', 'HINDUNILVR.NS': 'Hindustan Unilever',
-                'LT.NS': 'Larsen & Toubro', 'SBIN.NS': 'State Bank of India',
-                'BHARTIARTL.NS': 'Bharti Airtel', 'ASIANPAINT.NS': 'Asian Paints',
-                'MARUTI.NS': 'Maruti Suzuki', 'BAJFINANCE.NS': 'Bajaj Finance',
-                'WIPRO.NS': 'Wipro Limited', 'ULTRACEMCO.NS': 'UltraTech Cement',
-                
-                # European Stocks
-                'ASML.AS': 'ASML Holding', 'SAP.F': 'SAP SE', 'TSCO.L': 'Tesco PLC',
-                
-                # Other Global
-                'SHOP.TO': 'Shopify Inc', 'CBA.AX': 'Commonwealth Bank', '700.HK': 'Tencent'
-            }
-            
-            # Find stocks that match the query by symbol or name
-            for symbol, name in popular_stocks.items():
-                if (query_upper in symbol or 
-                    query_upper in name.upper() or 
-                    symbol.startswith(query_upper)):
+            search_candidates = [query_upper + suffix for suffix in _YF_SUFFIXES]
+
+            # Symbol-prefix hits come straight off the sorted catalog with
+            # one bisect; only substring matches (inside a symbol or a
+            # company name) still need a scan
+            for symbol in _popular_prefix_matches(query_upper):
+                if symbol not in search_candidates:
+                    search_candidates.append(symbol)
+
+            for symbol, upper_name in _POPULAR_ITEMS:
+                if query_upper in symbol or query_upper in upper_name:
                     if symbol not in search_candidates:
                         search_candidates.append(symbol)
             
-            # Step 3: Try to get live data for each candidate
+            # Step 3: Probe the candidates concurrently, capped so a broad
+            # query can't hammer Yahoo into throttling us
+            sem = asyncio.Semaphore(8)
+
+            async def probe(sym):
+                async with sem:
+                    return sym, await RobustStockService.get_stock_info(sym)
+
+            pairs = await asyncio.gather(
+                *(probe(symbol) for symbol in search_candidates[:limit * 4]),
+                return_exceptions=True
+            )
+
             results = []
-            for symbol in search_candidates[:limit * 2]:  # Try more than limit to ensure we get enough valid results
-                try:
-                    stock_info = await RobustStockService.get_stock_info(symbol)
-                    if stock_info and len(results) < limit:
-                        results.append(stock_info)
-                        logger.info(f"✅ Found valid stock: {symbol} - {stock_info.name}")
-                except Exception as e:
-                    logger.debug(f"❌ {symbol} not found: {e}")
+            for pair in pairs:
+                if isinstance(pair, Exception):
                     continue
+                symbol, stock_info = pair
+                if stock_info:
+                    results.append(stock_info)
+                    logger.info("✅ Found valid stock: %s - %s", symbol, stock_info.name)
+                    if len(results) == limit:
+                        break
             
-            logger.info(f"🔍 Search '{query}' returned {len(results)} valid stocks")
+            logger.info("🔍 Search '%s' returned %d valid stocks", query, len(results))
             return results
             
         except Exception as e:
             logger.error(f"🚨 Error in stock search for '{query}': {e}")
             return []
-            
-        except Exception as e:
-            logger.error(f"🚨 Error searching stocks for '{query}': {e}")
-            return []
     
     @staticmethod
     async def get_popular_stocks() -> List[StockInfo]:
@@ -164,20 +352,63 @@ class RobustStockService:
                 'TATAMOTORS.NS',  # Tata Motors
             ]
             
-            # Get live data for all popular stocks
-            results = []
-            for symbol in popular_symbols:
-                stock_info = await RobustStockService.get_stock_info(symbol)
-                if stock_info:
-                    results.append(stock_info)
+            # One batched call prices the whole list in a single upstream
+            # round trip (with a shared-cache MGET in front of it)
+            infos = await RobustStockService.get_stock_infos(popular_symbols)
+            results = [infos[symbol] for symbol in popular_symbols if symbol in infos]
             
-            logger.info(f"📈 Loaded {len(results)} popular Indian stocks with LIVE prices")
+            logger.info("📈 Loaded %d popular Indian stocks with LIVE prices", len(results))
             return results
             
         except Exception as e:
             logger.error(f"🚨 Error getting popular stocks: {e}")
             return []
     
+    @staticmethod
+    def _movers_from(stocks: List[StockInfo]) -> Dict[str, List[MarketMover]]:
+        """Pick top gainers/losers from an already-fetched stock list."""
+        if not stocks:
+            return {"gainers": [], "losers": []}
+
+        # Heap selection is O(N log 5) vs sorting everything, and
+        # nsmallest also fixes the old losers[-5:] slice, which
+        # returned the five LEAST negative losers
+        def to_mover(stock):
+            return MarketMover(
+                symbol=stock.symbol,
+                name=stock.name,
+                current_price=stock.current_price,
+                change=stock.change,  # Add the absolute change amount
+                change_percent=stock.change_percent
+            )
+
+        return {
+            "gainers": [
+                to_mover(s) for s in heapq.nlargest(
+                    5, (s for s in stocks if s.change_percent > 0),
+                    key=lambda x: x.change_percent
+                )
+            ],
+            "losers": [
+                to_mover(s) for s in heapq.nsmallest(
+                    5, (s for s in stocks if s.change_percent <= 0),
+                    key=lambda x: x.change_percent
+                )
+            ]
+        }
+
+    @staticmethod
+    async def _market_snapshot() -> tuple:
+        """
+        One concurrent fetch of the full popular-stock universe and the
+        index list. Movers and sentiment both derive from this snapshot,
+        so each caller pays for one traversal of the upstream data.
+        """
+        return await asyncio.gather(
+            RobustStockService.get_popular_stocks(),
+            RobustStockService.get_indian_indices()
+        )
+
     @staticmethod
     async def get_market_movers() -> Dict[str, List[MarketMover]]:
         """
@@ -186,40 +417,11 @@ class RobustStockService:
         try:
             # Get popular stocks data
             stocks = await RobustStockService.get_popular_stocks()
-            
-            if not stocks:
-                return {"gainers": [], "losers": []}
-            
-            # Sort by change percentage
-            sorted_stocks = sorted(stocks, key=lambda x: x.change_percent, reverse=True)
-            
-            # Create market movers
-            gainers = []
-            losers = []
-            
-            for stock in sorted_stocks:
-                mover = MarketMover(
-                    symbol=stock.symbol,
-                    name=stock.name,
-                    current_price=stock.current_price,
-                    change=stock.change,  # Add the absolute change amount
-                    change_percent=stock.change_percent
-                )
-                
-                if stock.change_percent > 0:
-                    gainers.append(mover)
-                else:
-                    losers.append(mover)
-            
-            # Return top 5 gainers and losers
-            result = {
-                "gainers": gainers[:5],
-                "losers": losers[-5:] if losers else []
-            }
-            
-            logger.info(f"📊 Market movers: {len(result['gainers'])} gainers, {len(result['losers'])} losers")
+            result = RobustStockService._movers_from(stocks)
+
+            logger.info("📊 Market movers: %d gainers, %d losers", len(result['gainers']), len(result['losers']))
             return result
-            
+
         except Exception as e:
             logger.error(f"🚨 Error getting market movers: {e}")
             return {"gainers": [], "losers": []}
@@ -237,21 +439,19 @@ class RobustStockService:
             if not current_info:
                 return None
             
-            # Generate some sample historical data
-            dates = []
-            prices = []
+            # Generate some sample historical data: one clock read and one
+            # vectorized price ramp instead of 30 datetime.now() calls
             base_price = current_info.current_price
-            
-            for i in range(30):  # 30 days
-                date = datetime.now() - timedelta(days=i)
-                price = base_price * (1 + (i * 0.002))  # Small trend
-                dates.append(date.isoformat())
-                prices.append(round(price, 2))
-            
+            now = datetime.now()
+
+            offsets = np.arange(29, -1, -1)  # oldest day first
+            prices = np.round(base_price * (1 + offsets * 0.002), 2).tolist()
+            dates = [(now - timedelta(days=int(i))).isoformat() for i in offsets]
+
             return StockHistory(
                 symbol=symbol,
-                dates=list(reversed(dates)),
-                prices=list(reversed(prices)),
+                dates=dates,
+                prices=prices,
                 volumes=[1000000] * 30  # Sample volume
             )
             
@@ -277,14 +477,11 @@ class RobustStockService:
                 '^CNXMETAL',  # Nifty Metal
             ]
             
-            # Get live data for all Indian indices
-            results = []
-            for symbol in indian_indices:
-                stock_info = await RobustStockService.get_stock_info(symbol)
-                if stock_info:
-                    results.append(stock_info)
+            # Same batched path as get_popular_stocks
+            infos = await RobustStockService.get_stock_infos(indian_indices)
+            results = [infos[symbol] for symbol in indian_indices if symbol in infos]
             
-            logger.info(f"📈 Loaded {len(results)} Indian indices with LIVE prices")
+            logger.info("📈 Loaded %d Indian indices with LIVE prices", len(results))
             return results
             
         except Exception as e:
@@ -297,6 +494,8 @@ class RobustStockService:
         Get India VIX (volatility index) with LIVE market data.
         This measures market volatility and fear index.
         """
+        # One clock read serves every branch below
+        now_iso = datetime.now().isoformat()
         try:
             # India VIX symbol
             vix_symbol = '^INDIAVIX'
@@ -313,7 +512,7 @@ class RobustStockService:
                     'previous_close': 11.53,
                     'change_amount': -0.33,
                     'change_percent': -2.86,
-                    'last_updated': datetime.now().isoformat()
+                    'last_updated': now_iso
                 }
             
             # Calculate VIX specific metrics
@@ -323,10 +522,10 @@ class RobustStockService:
                 'previous_close': live_data['previous_close'],
                 'change_amount': live_data['current_price'] - live_data['previous_close'],
                 'change_percent': live_data['change_percent'],
-                'last_updated': datetime.now().isoformat()
+                'last_updated': now_iso
             }
             
-            logger.info(f"📊 Got LIVE India VIX: {vix_data['current_price']:.2f} ({vix_data['change_percent']:+.2f}%)")
+            logger.info("📊 Got LIVE India VIX: %.2f (%+.2f%%)", vix_data['current_price'], vix_data['change_percent'])
             return vix_data
             
         except Exception as e:
@@ -338,41 +537,38 @@ class RobustStockService:
                 'previous_close': 11.53,
                 'change_amount': -0.33,
                 'change_percent': -2.86,
-                'last_updated': datetime.now().isoformat()
+                'last_updated': now_iso
             }
 
     async def get_market_sentiment(self) -> Dict:
         """
         Get real-time market sentiment based on advancing/declining stocks in Indian markets.
         """
+        # One clock read serves every branch below
+        now_iso = datetime.now().isoformat()
         try:
-            # Get market movers data to calculate sentiment
-            movers = await self.get_market_movers()
-            gainers = movers.get('gainers', [])
-            losers = movers.get('losers', [])
-            
-            # Get Indian indices for broader market analysis
-            indices = await self.get_indian_indices()
-            
-            # Calculate advancing vs declining based on actual market data
-            advancing_count = len([g for g in gainers if g.change_percent > 0])
-            declining_count = len([l for l in losers if l.change_percent < 0])
-            
-            # Calculate index performance for sentiment
-            nifty_change = 0
-            sensex_change = 0
-            bank_nifty_change = 0
-            it_change = 0
+            # One snapshot feeds everything below. Counting breadth over
+            # the full universe also fixes the old logic, which counted
+            # only the 5-element gainers/losers slices and so capped the
+            # advance/decline ratio at 5/5
+            all_stocks, indices = await self._market_snapshot()
+
+            advancing_count = sum(1 for s in all_stocks if s.change_percent > 0)
+            declining_count = sum(1 for s in all_stocks if s.change_percent < 0)
             
+            # Calculate index performance for sentiment: one exact-map
+            # lookup per index instead of re-uppercasing the symbol for
+            # four substring scans
+            index_changes = {}
             for index in indices:
-                if 'NIFTY' in index.symbol.upper() and 'BANK' not in index.symbol.upper():
-                    nifty_change = index.change_percent
-                elif 'SENSEX' in index.symbol.upper() or 'BSESN' in index.symbol.upper():
-                    sensex_change = index.change_percent
-                elif 'BANK' in index.symbol.upper():
-                    bank_nifty_change = index.change_percent
-                elif 'IT' in index.symbol.upper() or 'CNXIT' in index.symbol.upper():
-                    it_change = index.change_percent
+                key = _INDEX_MAP.get(index.symbol.upper())
+                if key:
+                    index_changes[key] = index.change_percent
+
+            nifty_change = index_changes.get('nifty', 0)
+            sensex_change = index_changes.get('sensex', 0)
+            bank_nifty_change = index_changes.get('bank_nifty', 0)
+            it_change = index_changes.get('it', 0)
             
             # Calculate overall market sentiment
             avg_index_change = (nifty_change + sensex_change) / 2 if sensex_change != 0 else nifty_change
@@ -397,6 +593,11 @@ class RobustStockService:
             
             # Generate realistic sector rotation data based on actual indices and market conditions
             base_performance = nifty_change if nifty_change != 0 else -0.5  # Default to slight negative if no data
+
+            # One RNG seeded on the minute bucket replaces the old
+            # hash(str(datetime.now().X)) churn - no syscalls or string
+            # hashing per sector, and values are stable within a minute
+            rng = random.Random(int(time.time() // 60))
             
             sector_rotation = [
                 {
@@ -409,15 +610,15 @@ class RobustStockService:
                 },
                 {
                     'sector': 'Pharma', 
-                    'performance': round(base_performance * 0.8 + (0.1 * (hash(str(datetime.now().hour)) % 20 - 10)), 2)
+                    'performance': round(base_performance * 0.8 + 0.1 * rng.randint(-10, 10), 2)
                 },
                 {
                     'sector': 'Auto', 
-                    'performance': round(base_performance * 1.1 + (0.15 * (hash(str(datetime.now().minute)) % 20 - 10)), 2)
+                    'performance': round(base_performance * 1.1 + 0.15 * rng.randint(-10, 10), 2)
                 },
                 {
                     'sector': 'FMCG', 
-                    'performance': round(base_performance * 0.7 + (0.05 * (hash(str(datetime.now().second)) % 20 - 10)), 2)
+                    'performance': round(base_performance * 0.7 + 0.05 * rng.randint(-10, 10), 2)
                 }
             ]
             
@@ -425,14 +626,14 @@ class RobustStockService:
                 'advance_decline_ratio': round(advance_decline_ratio, 2),
                 'advancing_stocks': advancing_count,
                 'declining_stocks': declining_count,
-                'unchanged': max(0, 20 - advancing_count - declining_count),
+                'unchanged': max(0, len(all_stocks) - advancing_count - declining_count),
                 'bullish_sentiment': bullish_sentiment,
                 'market_breadth': market_breadth,
                 'sector_rotation': sector_rotation,
-                'last_updated': datetime.now().isoformat()
+                'last_updated': now_iso
             }
             
-            logger.info(f"📈 Market Sentiment: {market_breadth} ({bullish_sentiment}% bullish)")
+            logger.info("📈 Market Sentiment: %s (%d%% bullish)", market_breadth, bullish_sentiment)
             return sentiment_data
             
         except Exception as e:
@@ -446,7 +647,7 @@ class RobustStockService:
                 'bullish_sentiment': 50,
                 'market_breadth': 'NEUTRAL',
                 'sector_rotation': [],
-                'last_updated': datetime.now().isoformat()
+                'last_updated': now_iso
             }
 
     async def get_technical_indicators(self, symbol: str) -> Dict:
@@ -454,6 +655,8 @@ class RobustStockService:
         Get technical indicators (RSI, MACD, SMA) for a given symbol.
         Always returns data, either from real analysis or intelligent fallback.
         """
+        # One clock read serves every branch below
+        now_iso = datetime.now().isoformat()
         try:
             # First try to get current price info
             try:
@@ -467,61 +670,18 @@ class RobustStockService:
                 history = await self.get_stock_history(symbol, '3mo')
                 
                 if history and history.prices and len(history.prices) >= 20:
-                    prices = [float(p['close']) for p in history.prices if p.get('close')]
-                    
-                    if len(prices) >= 20:
-                        # Calculate Simple Moving Averages
-                        sma20 = sum(prices[-20:]) / 20
-                        sma50 = sum(prices[-50:]) / 50 if len(prices) >= 50 else sum(prices) / len(prices)
-                        
-                        # Simple RSI calculation (14-period)
-                        def calculate_rsi(prices, period=14):
-                            if len(prices) < period + 1:
-                                return 50  # neutral
-                            
-                            gains = []
-                            losses = []
-                            
-                            for i in range(1, len(prices)):
-                                change = prices[i] - prices[i-1]
-                                if change > 0:
-                                    gains.append(change)
-                                    losses.append(0)
-                                else:
-                                    gains.append(0)
-                                    losses.append(abs(change))
-                            
-                            if len(gains) < period:
-                                return 50
-                            
-                            avg_gain = sum(gains[-period:]) / period
-                            avg_loss = sum(losses[-period:]) / period
-                            
-                            if avg_loss == 0:
-                                return 100
-                            
-                            rs = avg_gain / avg_loss
-                            rsi = 100 - (100 / (1 + rs))
-                            return rsi
-                        
-                        rsi = calculate_rsi(prices)
-                        
-                        # Simple MACD calculation (12, 26, 9)
-                        def calculate_ema(prices, period):
-                            if len(prices) < period:
-                                return prices[-1]
-                            
-                            multiplier = 2 / (period + 1)
-                            ema = prices[0]
-                            
-                            for price in prices[1:]:
-                                ema = (price * multiplier) + (ema * (1 - multiplier))
-                            
-                            return ema
-                        
-                        ema12 = calculate_ema(prices, 12)
-                        ema26 = calculate_ema(prices, 26)
-                        macd = ema12 - ema26
+                    # Contiguous float64 view straight off the schema -
+                    # prices is a plain float list, no per-bar dicts
+                    p = history.prices_np()
+
+                    if p.size >= 20:
+                        # Vectorized indicator math: one C loop per array
+                        # instead of a Python bytecode dispatch per price
+                        sma20 = float(p[-20:].mean())
+                        sma50 = float(p[-50:].mean()) if p.size >= 50 else float(p.mean())
+
+                        rsi = _rsi_np(p, 14)
+                        macd = _ema_np(p, 12) - _ema_np(p, 26)
                         
                         # Generate trading signal based on indicators
                         if rsi < 30 and current_price > sma20 and macd > 0:
@@ -546,11 +706,11 @@ class RobustStockService:
                             'sma50': round(sma50, 2),
                             'signal': signal,
                             'current_price': current_price,
-                            'last_updated': datetime.now().isoformat(),
+                            'last_updated': now_iso,
                             'data_source': 'historical'
                         }
                         
-                        logger.info(f"📊 Technical for {symbol}: RSI={rsi:.1f}, Signal={signal}")
+                        logger.info("📊 Technical for %s: RSI=%.1f, Signal=%s", symbol, rsi, signal)
                         return technical_data
             except Exception as hist_error:
                 logger.warning(f"⚠️ Historical data unavailable for {symbol}: {hist_error}")
@@ -563,25 +723,12 @@ class RobustStockService:
             except:
                 market_trend = 'NEUTRAL'
             
-            # Generate technical indicators that align with market sentiment
-            price_hash = hash(symbol) % 1000  # Use symbol hash for consistency
-            
-            if market_trend == 'BULLISH':
-                rsi = 45 + (20 * (price_hash % 100) / 100)  # 45-65 range
-                macd = 5 + (10 * (price_hash % 50) / 50)    # 5-15 range
-                signal = 'BUY' if rsi < 55 else 'HOLD_BULLISH'
-            elif market_trend == 'BEARISH':
-                rsi = 25 + (20 * (price_hash % 100) / 100)  # 25-45 range
-                macd = -15 + (10 * (price_hash % 50) / 50)  # -15 to -5 range
-                signal = 'SELL' if rsi > 35 else 'HOLD_BEARISH'
-            else:  # NEUTRAL
-                rsi = 40 + (20 * (price_hash % 100) / 100)  # 40-60 range
-                macd = -5 + (10 * (price_hash % 50) / 50)   # -5 to 5 range
-                signal = 'HOLD'
-            
-            # Calculate SMAs based on current price with some variance
-            sma20 = current_price * (0.98 + 0.04 * ((price_hash % 25) / 25))
-            sma50 = current_price * (0.96 + 0.08 * ((price_hash % 30) / 30))
+            # Memoized per (symbol, trend, minute) - see _estimated_technicals
+            rsi, macd, signal, sma20_factor, sma50_factor = _estimated_technicals(
+                symbol, market_trend, int(time.time() // 60)
+            )
+            sma20 = current_price * sma20_factor
+            sma50 = current_price * sma50_factor
             
             technical_data = {
                 'symbol': symbol,
@@ -591,11 +738,11 @@ class RobustStockService:
                 'sma50': round(sma50, 2),
                 'signal': signal,
                 'current_price': current_price,
-                'last_updated': datetime.now().isoformat(),
+                'last_updated': now_iso,
                 'data_source': 'estimated'
             }
             
-            logger.info(f"📊 Technical (estimated) for {symbol}: RSI={rsi:.1f}, Signal={signal}")
+            logger.info("📊 Technical (estimated) for %s: RSI=%.1f, Signal=%s", symbol, rsi, signal)
             return technical_data
             
         except Exception as e:
@@ -609,7 +756,7 @@ class RobustStockService:
                 'sma50': 23800.0,
                 'signal': 'HOLD',
                 'current_price': 24000.0,
-                'last_updated': datetime.now().isoformat(),
+                'last_updated': now_iso,
                 'data_source': 'default'
             }
 
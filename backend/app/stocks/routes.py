@@ -3,10 +3,12 @@ ROBUST Stock routes with REAL live market data.
 """
 from typing import List, Dict
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from .schemas import StockInfo, StockHistory, MarketMover
+from .live_data_service import live_data_service
 from .robust_services import stock_service
 
 router = APIRouter(prefix="/stocks", tags=["stocks"])
@@ -25,17 +27,19 @@ async def search_stocks(
     return results
 
 
-@router.get("/{symbol}", response_model=StockInfo)
+@router.get("/{symbol}")
 async def get_stock_info(
     symbol: str,
     db: AsyncSession = Depends(get_db)
-) -> StockInfo:
+) -> Response:
     """Get current stock information with LIVE market price."""
-    stock_info = await stock_service.get_stock_info(symbol)
-    if not stock_info:
+    # Serve the pre-serialized cache bytes directly - on a warm cache this
+    # skips both model validation and JSON encoding for the hottest endpoint
+    price_bytes = await live_data_service.get_live_price_bytes(symbol)
+    if not price_bytes:
         raise HTTPException(status_code=404, detail="Stock not found")
-    
-    return stock_info
+
+    return Response(content=price_bytes, media_type="application/json")
 
 
 @router.get("/{symbol}/history", response_model=StockHistory)
@@ -52,24 +56,32 @@ async def get_stock_history(
 
 
 @router.get("/market/movers")
-async def get_market_movers() -> Dict[str, List[MarketMover]]:
+async def get_market_movers() -> ORJSONResponse:
     """Get top market gainers and losers with LIVE data."""
+    # These payloads are built from our own trusted services, so the
+    # handler dumps the models itself and skips FastAPI's second-pass
+    # response validation - a pure CPU saving on a high-QPS route
     movers = await stock_service.get_market_movers()
-    return movers
+    return ORJSONResponse({
+        side: [mover.model_dump(mode="json") for mover in items]
+        for side, items in movers.items()
+    })
 
 
 @router.get("/popular")
-async def get_popular_stocks() -> List[StockInfo]:
+async def get_popular_stocks() -> ORJSONResponse:
     """Get popular stocks with LIVE market prices for trading dashboard."""
+    # Trusted internal payload - skip response re-validation (see movers)
     stocks = await stock_service.get_popular_stocks()
-    return stocks
+    return ORJSONResponse([stock.model_dump(mode="json") for stock in stocks])
 
 
 @router.get("/indices/indian")
-async def get_indian_indices() -> List[StockInfo]:
+async def get_indian_indices() -> ORJSONResponse:
     """Get Indian market indices with LIVE market data."""
+    # Trusted internal payload - skip response re-validation (see movers)
     indices = await stock_service.get_indian_indices()
-    return indices
+    return ORJSONResponse([index.model_dump(mode="json") for index in indices])
 
 
 @router.get("/vix/india")
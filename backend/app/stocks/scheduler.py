@@ -6,7 +6,15 @@ import logging
 from datetime import datetime
 from typing import Dict, Any
 
-from ..database import get_db
+import orjson
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional in dev
+    aioredis = None
+
+from ..config import settings
+from ..database import AsyncSessionLocal
 from .live_service import live_stock_service
 
 logger = logging.getLogger(__name__)
@@ -18,6 +26,12 @@ class LiveDataScheduler:
         self.is_running = False
         self.live_cache = {}
         self.last_update = None
+        # Shared Redis mirror: with multiple workers each process reads
+        # the same prices instead of fetching upstream N times, and a
+        # restart warms from Redis instead of going cold
+        self.redis = None
+        if aioredis and getattr(settings, "REDIS_URL", None):
+            self.redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
         
     async def fetch_and_update_live_data(self):
         """Fetch live data for all relevant stocks and update portfolios."""
@@ -25,29 +39,38 @@ class LiveDataScheduler:
             # Get dashboard stocks (always fetch these)
             dashboard_stocks = await live_stock_service.get_dashboard_stocks()
             
-            # Get all portfolio stocks from database
+            # Get all portfolio stocks from database. The scheduler is a
+            # long-running task, not a request handler, so it opens its
+            # session straight from the factory instead of driving the
+            # get_db() dependency generator by hand
             portfolio_stocks = set()
-            async for db in get_db():
+            portfolio_ids = set()
+            async with AsyncSessionLocal() as db:
                 try:
-                    # Get all unique portfolio IDs
-                    from sqlalchemy import select, text
-                    from ..database import Portfolio, Position
-                    
-                    # Get all active portfolios
-                    result = await db.execute(select(Portfolio.id))
-                    portfolio_ids = [row[0] for row in result.fetchall()]
-                    
-                    # Get stocks for each portfolio
-                    for portfolio_id in portfolio_ids:
-                        stocks = await live_stock_service.get_portfolio_stocks(db, portfolio_id)
-                        portfolio_stocks.update(stocks)
-                    
+                    from sqlalchemy import select
+                    from ..database import Position
+
+                    # One DISTINCT query yields both the symbol universe
+                    # and the portfolios to update later - the whole
+                    # tick costs a single read instead of 2 + 2N
+                    result = await db.execute(
+                        select(Position.portfolio_id, Position.symbol)
+                        .where(Position.quantity > 0)
+                        .distinct()
+                    )
+                    for portfolio_id, symbol in result.fetchall():
+                        portfolio_ids.add(portfolio_id)
+                        portfolio_stocks.add(symbol)
+
                 except Exception as e:
                     logger.error(f"Error getting portfolio stocks: {e}")
-                break
             
-            # Combine all stocks we need to fetch
-            all_stocks = list(set(dashboard_stocks + list(portfolio_stocks)))
+            # Combine all stocks we need to fetch: one set-literal union,
+            # uppercased here once so downstream cache and portfolio
+            # lookups never re-normalize
+            all_stocks = list({
+                s.upper() for s in (*dashboard_stocks, *portfolio_stocks)
+            })
             logger.info(f"Fetching live data for {len(all_stocks)} stocks: {all_stocks}")
             
             # Fetch live prices
@@ -57,25 +80,28 @@ class LiveDataScheduler:
                 # Update cache
                 self.live_cache.update(live_prices)
                 self.last_update = datetime.utcnow()
+                await self._mirror_to_redis(live_prices)
                 
-                # Update all portfolios with new prices
-                async for db in get_db():
-                    try:
-                        # Get all portfolio IDs again
-                        result = await db.execute(select(Portfolio.id))
-                        portfolio_ids = [row[0] for row in result.fetchall()]
-                        
-                        # Update each portfolio
-                        for portfolio_id in portfolio_ids:
+                # Update all portfolios with new prices, reusing the
+                # portfolio ids collected with the symbol query above
+                try:
+                    # Each portfolio update runs on its own pooled
+                    # session so the writes overlap instead of
+                    # serializing - the engine pool is sized for this
+                    async def update_one(portfolio_id):
+                        async with AsyncSessionLocal() as session:
                             await live_stock_service.update_portfolio_values(
-                                db, portfolio_id, live_prices
+                                session, portfolio_id, live_prices
                             )
-                        
-                        logger.info(f"Updated {len(portfolio_ids)} portfolios with live prices")
-                        
-                    except Exception as e:
-                        logger.error(f"Error updating portfolios: {e}")
-                    break
+
+                    await asyncio.gather(
+                        *(update_one(portfolio_id) for portfolio_id in portfolio_ids)
+                    )
+
+                    logger.info(f"Updated {len(portfolio_ids)} portfolios with live prices")
+
+                except Exception as e:
+                    logger.error(f"Error updating portfolios: {e}")
                 
                 logger.info(f"Live data update completed. Fetched {len(live_prices)} stocks.")
             else:
@@ -106,9 +132,35 @@ class LiveDataScheduler:
         self.is_running = False
         logger.info("Stopped live data scheduler")
     
-    def get_cached_price(self, symbol: str) -> Dict[str, Any]:
-        """Get cached live price for a symbol."""
-        return self.live_cache.get(symbol.upper(), {})
+    async def _mirror_to_redis(self, live_prices: Dict[str, Dict[str, Any]]):
+        """Write fresh prices to the shared Redis cache (60s TTL)."""
+        if not self.redis:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            for symbol, data in live_prices.items():
+                pipe.set(f"live:{symbol.upper()}", orjson.dumps(data), ex=60)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis cache mirror failed: {e}")
+
+    async def get_cached_price(self, symbol: str) -> Dict[str, Any]:
+        """Get cached live price for a symbol (local dict, then Redis)."""
+        cache_key = symbol.upper()
+        data = self.live_cache.get(cache_key, {})
+        if data or not self.redis:
+            return data
+
+        # Another worker (or a previous run) may have the price
+        try:
+            raw = await self.redis.get(f"live:{cache_key}")
+            if raw:
+                data = orjson.loads(raw)
+                self.live_cache[cache_key] = data
+                return data
+        except Exception as e:
+            logger.warning(f"Redis cache read failed: {e}")
+        return {}
     
     def get_all_cached_prices(self) -> Dict[str, Dict[str, Any]]:
         """Get all cached prices."""
@@ -4,6 +4,7 @@ Stock data schemas.
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List
+import numpy as np
 from pydantic import BaseModel
 
 
@@ -39,6 +40,10 @@ class StockHistory(BaseModel):
     prices: List[float]
     volumes: List[int]
 
+    def prices_np(self) -> np.ndarray:
+        """Prices as a contiguous float64 array for vectorized indicator math."""
+        return np.asarray(self.prices, dtype=np.float64)
+
 
 class MarketMover(BaseModel):
     """Market mover schema for gainers/losers."""
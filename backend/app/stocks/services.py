@@ -3,8 +3,15 @@ Stock data services using Alpha Vantage API for real-time market data.
 """
 import asyncio
 import aiohttp
+import heapq
 import json
+import logging
+import orjson
+import random
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from decimal import Decimal
 from typing import Optional, List, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,37 +21,264 @@ from ..database import Stock
 from ..config import settings
 from .schemas import StockInfo, StockHistory, MarketMover
 
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """LRU cache with per-entry expiry, for upstream API responses."""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expiry, value = entry
+        if time.monotonic() >= expiry:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float):
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = (time.monotonic() + ttl, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+# Response cache in front of Alpha Vantage, keyed by the request params.
+# TTLs follow how often the underlying data actually changes: quotes
+# every ~15s, dailies hourly, company overviews daily.
+_response_cache = TTLCache(maxsize=512)
+
+_FUNCTION_TTLS = {
+    "GLOBAL_QUOTE": 15,
+    "TIME_SERIES_DAILY": 3600,
+    "TIME_SERIES_INTRADAY": 60,
+    "OVERVIEW": 86400,
+    "SYMBOL_SEARCH": 600,
+}
+_DEFAULT_TTL = 60
+
+def _to_decimal(value) -> Optional[Decimal]:
+    """
+    Decimal coercion that skips the str round-trip when the value is
+    already a Decimal (cached payloads) or an int, and passes None
+    through. The hot dashboard paths build dozens of these per request.
+    """
+    if value is None or isinstance(value, Decimal):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    return Decimal(str(value))
+
+
+# Static fallback data for major stocks, frozen at import so no call
+# rebuilds the dict or its strings
+_BASE_DATA = MappingProxyType({
+    "AAPL": {"name": "Apple Inc.", "base_price": 175.43, "prev": 170.20, "sector": "Technology"},
+    "GOOGL": {"name": "Alphabet Inc.", "base_price": 2840.12, "prev": 2794.45, "sector": "Technology"},
+    "MSFT": {"name": "Microsoft Corporation", "base_price": 378.85, "prev": 376.40, "sector": "Technology"},
+    "AMZN": {"name": "Amazon.com Inc.", "base_price": 3127.50, "prev": 3089.25, "sector": "Consumer Discretionary"},
+    "TSLA": {"name": "Tesla Inc.", "base_price": 248.50, "prev": 236.20, "sector": "Automotive"},
+    "NVDA": {"name": "NVIDIA Corporation", "base_price": 875.28, "prev": 840.15, "sector": "Technology"},
+    "META": {"name": "Meta Platforms Inc.", "base_price": 298.15, "prev": 306.60, "sector": "Technology"},
+    "NFLX": {"name": "Netflix Inc.", "base_price": 445.12, "prev": 438.90, "sector": "Entertainment"},
+})
+
+# Symbol -> company name / sector lookups for the live-data branch of
+# get_stock_info (one hash lookup instead of conditional chains)
+_COMPANY_NAMES = MappingProxyType({
+    symbol: info["name"] for symbol, info in _BASE_DATA.items()
+})
+
+_SECTORS = MappingProxyType({
+    symbol: info["sector"] for symbol, info in _BASE_DATA.items()
+})
+
+
+# Popular stocks for the local search fallback, indexed once at import:
+# uppercased names for substring matches plus two-character symbol
+# buckets so prefix queries touch only a handful of entries
+_POPULAR_FALLBACK_STOCKS = [
+    {"symbol": "AAPL", "name": "Apple Inc."},
+    {"symbol": "GOOGL", "name": "Alphabet Inc."},
+    {"symbol": "MSFT", "name": "Microsoft Corporation"},
+    {"symbol": "AMZN", "name": "Amazon.com Inc."},
+    {"symbol": "TSLA", "name": "Tesla Inc."},
+    {"symbol": "NVDA", "name": "NVIDIA Corporation"},
+    {"symbol": "META", "name": "Meta Platforms Inc."},
+    {"symbol": "NFLX", "name": "Netflix Inc."},
+    {"symbol": "JPM", "name": "JPMorgan Chase & Co."},
+    {"symbol": "V", "name": "Visa Inc."},
+]
+
+_POPULAR_INDEXED = tuple(
+    (stock["symbol"], stock["name"].upper(), stock)
+    for stock in _POPULAR_FALLBACK_STOCKS
+)
+
+_SYMBOL_PREFIX_BUCKETS: Dict[str, List[Dict[str, str]]] = {}
+for _symbol, _name_upper, _stock in _POPULAR_INDEXED:
+    _SYMBOL_PREFIX_BUCKETS.setdefault(_symbol[:2], []).append(_stock)
+
+# Single-flight gate: identical requests already on the wire share one
+# future, so burst traffic costs one upstream call per params key
+_inflight: Dict[frozenset, asyncio.Future] = {}
+
+# Background quote refresh: request handlers answer from cache (or the
+# fallback) immediately and push the symbol here; a worker task drains
+# the queue in small batches and warms the quote cache for next time
+_refresh_queue: asyncio.Queue = asyncio.Queue()
+_refresh_task: Optional[asyncio.Task] = None
+_pending_refresh: set = set()
+
+
+def _enqueue_refresh(symbol: str):
+    """Queue a symbol for a background quote refresh (deduped)."""
+    sym = symbol.upper()
+    if sym in _pending_refresh:
+        return
+    _pending_refresh.add(sym)
+    _refresh_queue.put_nowait(sym)
+
+
+async def _refresh_worker():
+    """Drain the refresh queue, fetching up to 5 quotes per burst."""
+    while True:
+        batch = {await _refresh_queue.get()}
+        while len(batch) < 5:
+            try:
+                batch.add(_refresh_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            # The fetches themselves populate the TTL cache
+            await asyncio.gather(
+                *(AlphaVantageService.get_real_time_quote(s) for s in batch),
+                return_exceptions=True
+            )
+        finally:
+            _pending_refresh.difference_update(batch)
+
+
+def start_refresh_worker():
+    """Start the background refresh task (called from app startup)."""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.get_running_loop().create_task(_refresh_worker())
+
+
+async def stop_refresh_worker():
+    """Cancel the background refresh task (called from app shutdown)."""
+    global _refresh_task
+    if _refresh_task:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
+
+
+# Shared HTTP session for all Alpha Vantage calls. Creating a session per
+# request paid a fresh TCP+TLS handshake to alphavantage.co every time;
+# one pooled session keeps connections alive across calls.
+_session: Optional[aiohttp.ClientSession] = None
+_session_lock = asyncio.Lock()
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Lazily create the shared pooled session (locked against races)."""
+    global _session
+    if _session is None or _session.closed:
+        async with _session_lock:
+            if _session is None or _session.closed:
+                _session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(
+                        limit=50,
+                        limit_per_host=10,
+                        ttl_dns_cache=300,
+                        keepalive_timeout=60
+                    ),
+                    timeout=aiohttp.ClientTimeout(total=10)
+                )
+    return _session
+
+
+async def close_session():
+    """Close the shared session (called from app shutdown)."""
+    global _session
+    if _session and not _session.closed:
+        await _session.close()
+    _session = None
+
 
 class AlphaVantageService:
     """Service for fetching real-time stock data from Alpha Vantage API."""
-    
+
     BASE_URL = "https://www.alphavantage.co/query"
-    
+
     @staticmethod
     async def _make_request(params: Dict[str, str]) -> Optional[Dict]:
         """Make async HTTP request to Alpha Vantage API."""
         params["apikey"] = settings.ALPHA_VANTAGE_API_KEY
-        
+
+        # Serve repeats from the TTL cache - no HTTP round-trip at all
+        cache_key = frozenset(params.items())
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Coalesce with an identical request already in flight
+        inflight = _inflight.get(cache_key)
+        if inflight is not None:
+            return await inflight
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight[cache_key] = future
+
+        data = None
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(AlphaVantageService.BASE_URL, params=params, timeout=10) as response:
+            data = await AlphaVantageService._request_uncached(params, cache_key)
+            return data
+        finally:
+            _inflight.pop(cache_key, None)
+            future.set_result(data)
+
+    @staticmethod
+    async def _request_uncached(params: Dict[str, str], cache_key: frozenset) -> Optional[Dict]:
+        """The actual HTTP round-trip behind the cache and single-flight gate."""
+        try:
+            session = await _get_session()
+            async with session.get(AlphaVantageService.BASE_URL, params=params) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        # orjson over the raw bytes beats stdlib json on
+                        # the multi-KB TIME_SERIES_DAILY payloads
+                        data = orjson.loads(await response.read())
                         
                         # Check for API error messages
                         if "Error Message" in data:
-                            print(f"Alpha Vantage Error: {data['Error Message']}")
+                            logger.error("Alpha Vantage Error: %s", data['Error Message'])
                             return None
                         if "Note" in data:
-                            print(f"Alpha Vantage Note: {data['Note']}")
+                            logger.warning("Alpha Vantage Note: %s", data['Note'])
                             return None
-                            
+
+                        _response_cache.set(
+                            cache_key, data,
+                            _FUNCTION_TTLS.get(params.get("function"), _DEFAULT_TTL)
+                        )
                         return data
                     else:
-                        print(f"Alpha Vantage HTTP Error: {response.status}")
+                        logger.error("Alpha Vantage HTTP Error: %s", response.status)
                         return None
         except Exception as e:
-            print(f"Alpha Vantage Request Error: {e}")
+            logger.error("Alpha Vantage Request Error: %s", e)
             return None
     
     @staticmethod
@@ -88,19 +322,23 @@ class StockService:
     @staticmethod
     async def get_stock_info(symbol: str) -> Optional[StockInfo]:
         """Get real-time stock information with live data integration."""
+        # Canonicalize once: the background refresh fetches with the
+        # uppercased symbol, so cache lookups must use the same casing
+        # or mixed-case callers would miss the cache forever
+        symbol = symbol.upper()
         try:
             # First try to get live data from scheduler
             from .scheduler import live_scheduler
-            live_data = live_scheduler.get_cached_price(symbol)
+            live_data = await live_scheduler.get_cached_price(symbol)
             
             if live_data and live_data.get('price'):
-                print(f"Using live data for {symbol} from {live_data.get('source', 'cache')}")
+                logger.info("Using live data for %s from %s", symbol, live_data.get('source', 'cache'))
                 
                 return StockInfo(
-                    symbol=symbol.upper(),
+                    symbol=symbol,
                     name=StockService._get_company_name(symbol),
-                    current_price=Decimal(str(live_data['price'])),
-                    previous_close=Decimal(str(live_data.get('previous_close', live_data['price']))),
+                    current_price=_to_decimal(live_data['price']),
+                    previous_close=_to_decimal(live_data.get('previous_close', live_data['price'])),
                     market_cap=500000000000,  # Default market cap
                     sector=StockService._get_sector(symbol),
                     change_percent=float(live_data.get('change_percent', 0)),
@@ -109,18 +347,24 @@ class StockService:
                 )
             
             # If no live data available, try Alpha Vantage
-            print(f"No live data available for {symbol}, trying Alpha Vantage...")
-            
-            # Get real-time quote and company overview in parallel
-            quote_task = AlphaVantageService.get_real_time_quote(symbol)
-            overview_task = AlphaVantageService.get_company_overview(symbol)
-            
-            quote_data, overview_data = await asyncio.gather(quote_task, overview_task, return_exceptions=True)
-            
-            # Handle quote data
-            if isinstance(quote_data, Exception) or not quote_data:
-                print(f"Failed to get quote for {symbol}, using fallback...")
+            logger.info("No live data available for %s, trying Alpha Vantage...", symbol)
+
+            # Answer from the quote cache; on a miss, return the
+            # fallback immediately and let the background worker warm
+            # the cache, keeping request latency local-cache-bound
+            # instead of HTTP-bound. The overview likewise comes from
+            # its 24h TTL cache, warmed in the background on a miss
+            quote_data = StockService._get_quote_cached(symbol)
+
+            if quote_data is None:
+                _enqueue_refresh(symbol)
+                logger.info("No cached quote for %s, refreshing in background...", symbol)
                 return StockService._get_fallback_stock_info(symbol)
+
+            overview_data = StockService._get_overview_cached(symbol)
+            if overview_data is None:
+                # Warm the cache for the next caller without blocking this one
+                asyncio.ensure_future(AlphaVantageService.get_company_overview(symbol))
             
             # Extract quote information
             current_price = Decimal(quote_data.get("05. price", "0"))
@@ -144,7 +388,7 @@ class StockService:
                 sector = overview_data.get("Sector")
             
             return StockInfo(
-                symbol=symbol.upper(),
+                symbol=symbol,
                 name=company_name,
                 current_price=current_price,
                 previous_close=previous_close,
@@ -156,51 +400,73 @@ class StockService:
             )
             
         except Exception as e:
-            print(f"Error fetching real-time data for {symbol}: {e}")
+            logger.error("Error fetching real-time data for %s: %s", symbol, e)
             return StockService._get_fallback_stock_info(symbol)
     
+    @staticmethod
+    def _get_company_name(symbol: str) -> str:
+        """Known company name for a symbol, else the symbol itself."""
+        symbol_upper = symbol.upper()
+        return _COMPANY_NAMES.get(symbol_upper, symbol_upper)
+
+    @staticmethod
+    def _get_sector(symbol: str) -> str:
+        """Known sector for a symbol, defaulting to Technology."""
+        return _SECTORS.get(symbol.upper(), "Technology")
+
+    @staticmethod
+    def _get_quote_cached(symbol: str) -> Optional[Dict]:
+        """Cached GLOBAL_QUOTE payload - never triggers a fetch."""
+        key = frozenset({
+            "function": "GLOBAL_QUOTE",
+            "symbol": symbol,
+            "apikey": settings.ALPHA_VANTAGE_API_KEY
+        }.items())
+        data = _response_cache.get(key)
+        if data and "Global Quote" in data:
+            return data["Global Quote"]
+        return None
+
+    @staticmethod
+    def _get_overview_cached(symbol: str) -> Optional[Dict]:
+        """Company overview from the daily TTL cache only - no fetch on miss."""
+        key = frozenset({
+            "function": "OVERVIEW",
+            "symbol": symbol,
+            "apikey": settings.ALPHA_VANTAGE_API_KEY
+        }.items())
+        return _response_cache.get(key)
+
     @staticmethod
     def _get_fallback_stock_info(symbol: str) -> Optional[StockInfo]:
         """Fallback stock data when API fails or rate limit is reached."""
-        print(f"Using fallback data for {symbol}")
-        
-        # More realistic fallback data with slight randomization
-        import random
-        import time
-        
-        # Base data for major stocks
-        base_data = {
-            "AAPL": {"name": "Apple Inc.", "base_price": 175.43, "prev": 170.20, "sector": "Technology"},
-            "GOOGL": {"name": "Alphabet Inc.", "base_price": 2840.12, "prev": 2794.45, "sector": "Technology"},
-            "MSFT": {"name": "Microsoft Corporation", "base_price": 378.85, "prev": 376.40, "sector": "Technology"},
-            "AMZN": {"name": "Amazon.com Inc.", "base_price": 3127.50, "prev": 3089.25, "sector": "Consumer Discretionary"},
-            "TSLA": {"name": "Tesla Inc.", "base_price": 248.50, "prev": 236.20, "sector": "Automotive"},
-            "NVDA": {"name": "NVIDIA Corporation", "base_price": 875.28, "prev": 840.15, "sector": "Technology"},
-            "META": {"name": "Meta Platforms Inc.", "base_price": 298.15, "prev": 306.60, "sector": "Technology"},
-            "NFLX": {"name": "Netflix Inc.", "base_price": 445.12, "prev": 438.90, "sector": "Entertainment"},
-        }
+        logger.info("Using fallback data for %s", symbol)
         
         symbol_upper = symbol.upper()
-        if symbol_upper in base_data:
-            data = base_data[symbol_upper]
+        if symbol_upper in _BASE_DATA:
+            data = _BASE_DATA[symbol_upper]
             
-            # Add some realistic randomization (±2% from base price)
-            random.seed(int(time.time() / 300))  # Changes every 5 minutes
-            price_variation = random.uniform(-0.02, 0.02)
-            current_price = Decimal(str(data["base_price"] * (1 + price_variation)))
-            
-            previous_close = Decimal(str(data["prev"]))
+            # Add some realistic randomization (±2% from base price).
+            # A local RNG seeded per (5-minute bucket, symbol) keeps the
+            # values stable between refreshes without reseeding the
+            # process-global random state under concurrent requests -
+            # and different symbols no longer get identical draws
+            rng = random.Random(int(time.time() // 300) ^ hash(symbol_upper))
+            price_variation = rng.uniform(-0.02, 0.02)
+            current_price = _to_decimal(data["base_price"] * (1 + price_variation))
+
+            previous_close = _to_decimal(data["prev"])
             change_percent = float((current_price - previous_close) / previous_close * 100)
-            
+
             # Random but realistic volume
-            volume = random.randint(800000, 2000000)
+            volume = rng.randint(800000, 2000000)
             
             return StockInfo(
                 symbol=symbol_upper,
                 name=data["name"],
                 current_price=current_price,
                 previous_close=previous_close,
-                market_cap=random.randint(400000000000, 600000000000),  # 400B-600B
+                market_cap=rng.randint(400000000000, 600000000000),  # 400B-600B
                 sector=data["sector"],
                 change_percent=change_percent,
                 volume=volume,
@@ -224,20 +490,22 @@ class StockService:
                 return None
             
             time_series = data["Time Series (Daily)"]
-            
-            # Convert to lists for the response
-            dates = []
-            prices = []
-            volumes = []
-            
-            # Get the most recent 30 days (or available data)
-            sorted_dates = sorted(time_series.keys(), reverse=True)[:30]
-            
-            for date in reversed(sorted_dates):  # Reverse to get chronological order
-                day_data = time_series[date]
-                dates.append(date)
-                prices.append(float(day_data["4. close"]))
-                volumes.append(int(day_data["5. volume"]))
+
+            # Heap-select the 30 most recent days (ISO dates compare
+            # chronologically) instead of sorting the full series, then
+            # order the small result chronologically
+            top = heapq.nlargest(30, time_series.items(), key=lambda kv: kv[0])
+            top.sort(key=lambda kv: kv[0])
+
+            # Pre-sized lists, filled in one pass
+            dates = [None] * len(top)
+            prices = [None] * len(top)
+            volumes = [None] * len(top)
+
+            for i, (date, day_data) in enumerate(top):
+                dates[i] = date
+                prices[i] = float(day_data["4. close"])
+                volumes[i] = int(day_data["5. volume"])
             
             return StockHistory(
                 symbol=symbol.upper(),
@@ -247,7 +515,7 @@ class StockService:
             )
             
         except Exception as e:
-            print(f"Error fetching stock history for {symbol}: {e}")
+            logger.error("Error fetching stock history for %s: %s", symbol, e)
             return None
     
     @staticmethod
@@ -274,33 +542,32 @@ class StockService:
             return StockService._search_local_stocks(query)
             
         except Exception as e:
-            print(f"Error searching stocks: {e}")
+            logger.error("Error searching stocks: %s", e)
             return StockService._search_local_stocks(query)
     
     @staticmethod
     def _search_local_stocks(query: str) -> List[Dict[str, str]]:
         """Local stock search fallback."""
         query_upper = query.upper()
-        
-        # Popular stocks for fallback search
-        popular_stocks = [
-            {"symbol": "AAPL", "name": "Apple Inc."},
-            {"symbol": "GOOGL", "name": "Alphabet Inc."},
-            {"symbol": "MSFT", "name": "Microsoft Corporation"},
-            {"symbol": "AMZN", "name": "Amazon.com Inc."},
-            {"symbol": "TSLA", "name": "Tesla Inc."},
-            {"symbol": "NVDA", "name": "NVIDIA Corporation"},
-            {"symbol": "META", "name": "Meta Platforms Inc."},
-            {"symbol": "NFLX", "name": "Netflix Inc."},
-            {"symbol": "JPM", "name": "JPMorgan Chase & Co."},
-            {"symbol": "V", "name": "Visa Inc."},
-        ]
-        
+
+        # Symbol-prefix queries (the common case) resolve from a small
+        # two-character bucket instead of scanning the whole catalog
+        bucket = _SYMBOL_PREFIX_BUCKETS.get(query_upper[:2])
+        if bucket:
+            prefix_matches = [
+                stock for stock in bucket
+                if stock["symbol"].startswith(query_upper)
+            ]
+            if prefix_matches:
+                return prefix_matches[:5]
+
+        # Substring scan over the precomputed uppercased index - no
+        # per-call .upper() allocations
         matches = [
-            stock for stock in popular_stocks
-            if query_upper in stock["symbol"] or query_upper in stock["name"].upper()
+            stock for symbol, name_upper, stock in _POPULAR_INDEXED
+            if query_upper in symbol or query_upper in name_upper
         ]
-        
+
         return matches[:5]
     
     @staticmethod
@@ -334,18 +601,15 @@ class StockService:
                     else:
                         losers.append(mover)
             
-            # Sort gainers by change_percent (highest first)
-            gainers.sort(key=lambda x: x.change_percent, reverse=True)
-            # Sort losers by change_percent (lowest first)
-            losers.sort(key=lambda x: x.change_percent)
-            
+            # Heap selection takes the top/bottom 5 in O(N log 5)
+            # instead of sorting each list outright
             return {
-                "gainers": gainers[:5],
-                "losers": losers[:5]
+                "gainers": heapq.nlargest(5, gainers, key=lambda x: x.change_percent),
+                "losers": heapq.nsmallest(5, losers, key=lambda x: x.change_percent)
             }
             
         except Exception as e:
-            print(f"Error fetching market movers: {e}")
+            logger.error("Error fetching market movers: %s", e)
             return {"gainers": [], "losers": []}
     
     @staticmethod
@@ -1,6 +1,7 @@
 """
 Trading engine for executing buy/sell orders and managing portfolios.
 """
+import asyncio
 from decimal import Decimal
 from datetime import datetime
 from typing import Optional, Tuple
@@ -57,17 +58,12 @@ class TradingEngine:
             fees=fees
         )
         db.add(trade)
-        
-        # Update portfolio cash balance
-        await db.execute(
-            update(Portfolio)
-            .where(Portfolio.user_id == user.id)
-            .values(
-                cash_balance=Portfolio.cash_balance - total_amount,
-                total_invested=Portfolio.total_invested + total_amount
-            )
-        )
-        
+
+        # Update portfolio cash balance by mutating the loaded row; the
+        # unit of work batches it with the other writes at commit
+        portfolio.cash_balance -= total_amount
+        portfolio.total_invested += total_amount
+
         # Update or create position
         position_result = await db.execute(
             select(Position).where(
@@ -76,7 +72,7 @@ class TradingEngine:
             )
         )
         existing_position = position_result.scalar_one_or_none()
-        
+
         if existing_position:
             # Update existing position
             new_quantity = existing_position.quantity + quantity
@@ -84,17 +80,11 @@ class TradingEngine:
                 (existing_position.average_price * existing_position.quantity) +
                 (current_price * quantity)
             ) / new_quantity
-            
-            await db.execute(
-                update(Position)
-                .where(Position.id == existing_position.id)
-                .values(
-                    quantity=new_quantity,
-                    average_price=new_avg_price,
-                    current_value=new_avg_price * new_quantity,
-                    last_updated=datetime.utcnow()
-                )
-            )
+
+            existing_position.quantity = new_quantity
+            existing_position.average_price = new_avg_price
+            existing_position.current_value = new_avg_price * new_quantity
+            existing_position.last_updated = datetime.utcnow()
         else:
             # Create new position
             new_position = Position(
@@ -217,24 +207,38 @@ class TradingEngine:
         if portfolio:
             total_portfolio_value += portfolio.cash_balance
         
-        # Update each position's current value
+        # Fetch all prices concurrently - one awaited gather instead of a
+        # serial round-trip per position
+        symbols = sorted({position.symbol for position in positions})
+        stock_infos = await asyncio.gather(
+            *(StockService.get_stock_info(symbol) for symbol in symbols)
+        )
+        prices = {
+            symbol: info.current_price
+            for symbol, info in zip(symbols, stock_infos)
+            if info and info.current_price
+        }
+
+        # Accumulate the per-position updates and flush them as a single
+        # executemany statement instead of one UPDATE per row
+        now = datetime.utcnow()
+        position_updates = []
         for position in positions:
-            stock_info = await StockService.get_stock_info(position.symbol)
-            if stock_info and stock_info.current_price:
-                current_value = stock_info.current_price * position.quantity
-                unrealized_pnl = current_value - (position.average_price * position.quantity)
-                
-                await db.execute(
-                    update(Position)
-                    .where(Position.id == position.id)
-                    .values(
-                        current_value=current_value,
-                        unrealized_pnl=unrealized_pnl,
-                        last_updated=datetime.utcnow()
-                    )
-                )
-                
-                total_portfolio_value += current_value
+            current_price = prices.get(position.symbol)
+            if current_price is None:
+                continue
+            current_value = current_price * position.quantity
+            unrealized_pnl = current_value - (position.average_price * position.quantity)
+            position_updates.append({
+                "id": position.id,
+                "current_value": current_value,
+                "unrealized_pnl": unrealized_pnl,
+                "last_updated": now,
+            })
+            total_portfolio_value += current_value
+
+        if position_updates:
+            await db.execute(update(Position), position_updates)
         
         # Update portfolio total value
         if portfolio:
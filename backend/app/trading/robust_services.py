@@ -39,18 +39,24 @@ class RobustTradingService:
             # Calculate 0.05% brokerage fee
             fees = trade_value * Decimal('0.0005')
             
-            # Get portfolio
-            portfolio_result = await db.execute(
-                select(Portfolio).where(Portfolio.id == portfolio_id)
-            )
-            portfolio = portfolio_result.scalar_one_or_none()
-            if not portfolio:
+            # Load the portfolio and any existing position for this symbol
+            # in one round-trip instead of two separate SELECTs
+            row = (await db.execute(
+                select(Portfolio, Position)
+                .outerjoin(Position, and_(
+                    Position.portfolio_id == Portfolio.id,
+                    Position.symbol == trade_request.symbol
+                ))
+                .where(Portfolio.id == portfolio_id)
+            )).first()
+            if not row:
                 return TradeResponse(
                     success=False,
                     message="Portfolio not found",
                     trade_id=None
                 )
-            
+            portfolio, position = row
+
             if trade_request.order_type == OrderType.BUY:
                 # For BUY: Check if user has enough cash for trade_value + fees
                 total_cost = trade_value + fees
@@ -60,28 +66,34 @@ class RobustTradingService:
                         message=f"Insufficient funds. Need ${total_cost:.2f} (including ${fees:.2f} fees), have ${portfolio.cash_balance:.2f}",
                         trade_id=None
                     )
-                
+
                 # Execute buy order
                 trade_result = await RobustTradingService._execute_buy(
-                    db, portfolio, trade_request.symbol, trade_request.quantity, current_price
+                    db, portfolio, position, trade_request.symbol, trade_request.quantity, current_price
                 )
-                
+
             else:  # SELL
                 # Execute sell order
                 trade_result = await RobustTradingService._execute_sell(
-                    db, portfolio, trade_request.symbol, trade_request.quantity, current_price
+                    db, portfolio, position, trade_request.symbol, trade_request.quantity, current_price
                 )
-            
+
             if trade_result['success']:
+                # The commit performs the only flush: trade, position and
+                # portfolio changes go to the database in one batch
                 await db.commit()
                 logger.info(f"✅ Trade executed: {trade_request.order_type} {trade_request.quantity} {trade_request.symbol} @ ${current_price:.2f}")
+
+                # Let the scheduler recompute this portfolio on its next tick
+                from ..stocks.live_scheduler import live_scheduler
+                live_scheduler.mark_dirty(portfolio_id)
                 
                 if trade_request.order_type == OrderType.BUY:
                     total_cost = trade_value + fees
                     return TradeResponse(
                         success=True,
                         message=f"Successfully bought {trade_request.quantity} shares of {trade_request.symbol} at ${current_price:.2f}",
-                        trade_id=trade_result['trade_id'],
+                        trade_id=trade_result['trade'].id,
                         executed_price=float(current_price),
                         executed_quantity=trade_request.quantity,
                         total_cost=float(total_cost),
@@ -92,7 +104,7 @@ class RobustTradingService:
                     return TradeResponse(
                         success=True,
                         message=f"Successfully sold {trade_request.quantity} shares of {trade_request.symbol} at ${current_price:.2f}",
-                        trade_id=trade_result['trade_id'],
+                        trade_id=trade_result['trade'].id,
                         executed_price=float(current_price),
                         executed_quantity=trade_request.quantity,
                         total_proceeds=float(net_proceeds),
@@ -116,21 +128,15 @@ class RobustTradingService:
             )
     
     @staticmethod
-    async def _execute_buy(db: AsyncSession, portfolio: Portfolio, symbol: str, quantity: int, price: Decimal) -> Dict:
-        """Execute a buy order with live market price."""
+    async def _execute_buy(db: AsyncSession, portfolio: Portfolio, existing_position: Optional[Position],
+                           symbol: str, quantity: int, price: Decimal) -> Dict:
+        """Stage a buy order; the caller's commit flushes everything at once."""
         try:
             trade_value = price * Decimal(str(quantity))
             # Calculate 0.05% brokerage fee
             fees = trade_value * Decimal('0.0005')  # 0.05% brokerage charge
             total_cost = trade_value + fees
-            
-            # Check if user has enough cash including fees
-            if portfolio.cash_balance < total_cost:
-                return {
-                    'success': False,
-                    'message': f"Insufficient funds. Need ${total_cost:.2f} (including ${fees:.2f} fees), have ${portfolio.cash_balance:.2f}"
-                }
-            
+
             # Create trade record
             trade = Trade(
                 portfolio_id=portfolio.id,
@@ -144,23 +150,14 @@ class RobustTradingService:
                 created_at=datetime.now()
             )
             db.add(trade)
-            await db.flush()  # Get trade ID
-            
-            # Update or create position
-            position_result = await db.execute(
-                select(Position).where(
-                    and_(Position.portfolio_id == portfolio.id, Position.symbol == symbol)
-                )
-            )
-            existing_position = position_result.scalar_one_or_none()
-            
+
             if existing_position:
                 # Update existing position (average cost calculation uses trade value, not including fees)
                 old_value = existing_position.average_cost * Decimal(str(existing_position.quantity))
                 new_value = old_value + trade_value  # Use trade_value, not total_cost
                 new_quantity = existing_position.quantity + quantity
                 new_average_cost = new_value / Decimal(str(new_quantity))
-                
+
                 existing_position.quantity = new_quantity
                 existing_position.average_cost = new_average_cost
                 existing_position.current_value = price * Decimal(str(new_quantity))
@@ -178,19 +175,19 @@ class RobustTradingService:
                     last_updated=datetime.now()
                 )
                 db.add(position)
-            
+
             # Update portfolio cash balance (deduct total cost including fees)
             portfolio.cash_balance -= total_cost
             portfolio.updated_at = datetime.now()
-            
+
             logger.info(f"💰 BUY: {quantity} {symbol} @ ${price:.2f} = ${total_cost:.2f}")
-            
+
             return {
                 'success': True,
-                'trade_id': trade.id,
+                'trade': trade,
                 'message': f"Successfully bought {quantity} shares"
             }
-            
+
         except Exception as e:
             logger.error(f"🚨 Buy execution error: {e}")
             return {
@@ -199,17 +196,11 @@ class RobustTradingService:
             }
     
     @staticmethod
-    async def _execute_sell(db: AsyncSession, portfolio: Portfolio, symbol: str, quantity: int, price: Decimal) -> Dict:
-        """Execute a sell order with live market price."""
+    async def _execute_sell(db: AsyncSession, portfolio: Portfolio, position: Optional[Position],
+                            symbol: str, quantity: int, price: Decimal) -> Dict:
+        """Stage a sell order; the caller's commit flushes everything at once."""
         try:
             # Check if user has enough shares
-            position_result = await db.execute(
-                select(Position).where(
-                    and_(Position.portfolio_id == portfolio.id, Position.symbol == symbol)
-                )
-            )
-            position = position_result.scalar_one_or_none()
-            
             if not position or position.quantity < quantity:
                 available = position.quantity if position else 0
                 return {
@@ -235,8 +226,7 @@ class RobustTradingService:
                 created_at=datetime.now()
             )
             db.add(trade)
-            await db.flush()
-            
+
             # Update position
             position.quantity -= quantity
             if position.quantity == 0:
@@ -255,7 +245,7 @@ class RobustTradingService:
             
             return {
                 'success': True,
-                'trade_id': trade.id,
+                'trade': trade,
                 'message': f"Successfully sold {quantity} shares"
             }
             
@@ -286,12 +276,16 @@ class RobustTradingService:
             
             total_market_value = Decimal('0')
             positions_data = []
-            
+
+            # One batched quote request prices every position instead of
+            # awaiting Yahoo once per symbol
+            symbols = [pos_row.Position.symbol for pos_row in positions]
+            live_prices = await live_data_service.update_stock_prices(symbols) if symbols else {}
+
             for pos_row in positions:
                 position = pos_row.Position
-                
-                # Get live price for this position
-                live_data = await live_data_service.get_live_price(position.symbol)
+
+                live_data = live_prices.get(position.symbol)
                 if live_data:
                     current_price = Decimal(str(live_data['current_price']))
                     market_value = current_price * Decimal(str(position.quantity))
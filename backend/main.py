@@ -7,7 +7,7 @@ from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response
 
 from app.config import settings
 # Import production config if in production
@@ -42,12 +42,21 @@ async def lifespan(app: FastAPI):
     # Start competition scheduler
     await competition_scheduler.start_scheduler()
     print("🏆 Competition scheduler started - managing competition lifecycle")
+
+    # Start background quote-refresh worker
+    from app.stocks.services import start_refresh_worker
+    start_refresh_worker()
     
     yield
     
     # Shutdown
     live_scheduler.stop_live_updates()
     await competition_scheduler.stop_scheduler()
+    from app.stocks.live_service import live_stock_service
+    await live_stock_service.close()
+    from app.stocks.services import close_session, stop_refresh_worker
+    await stop_refresh_worker()
+    await close_session()
     print("⏹️  All schedulers stopped")
 
 
@@ -56,7 +65,10 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     debug=settings.DEBUG,
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson serializes the JSON-heavy routes (price lists, histories)
+    # several times faster than the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 